@@ -1,3 +1,14 @@
-from .core.hypercube import Hypercube
+from typing import TYPE_CHECKING
 
-__all__ = ['Hypercube']
\ No newline at end of file
+if TYPE_CHECKING:
+    from .core.hypercube import Hypercube
+
+__all__ = ['Hypercube']
+
+
+def __getattr__(name):
+    # Resolve Hypercube on first access so catalog-only users don't pay for pandas/matplotlib at import time
+    if name == 'Hypercube':
+        from .core.hypercube import Hypercube
+        return Hypercube
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
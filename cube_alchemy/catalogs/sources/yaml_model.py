@@ -4,6 +4,33 @@ from typing import Any, Dict
 
 from .yaml_single_file import YAMLSource
 
+# Meta keys dropped when writing specs back to YAML (frozensets for O(1) membership)
+_DROP_META = frozenset(("kind", "name"))
+_DROP_META_QUERY = frozenset(("kind", "name", "query"))
+_DROP_TRANSFORMER = frozenset(("kind", "name", "query", "transformer"))
+
+# Preferred key order within each saved query spec; unknown keys keep their order after these
+_DESIRED_RANK = {
+    k: i for i, k in enumerate(("dimensions", "metrics", "derived_metrics", "transformers", "having", "sort", "plots"))
+}
+_UNRANKED = len(_DESIRED_RANK)
+
+
+def _strip(d: Dict[str, Any], drop: frozenset) -> Dict[str, Any]:
+    # C-level copy plus a few pops beats rebuilding the dict key by key (drop sets are tiny)
+    out = d.copy()
+    for k in drop:
+        out.pop(k, None)
+    return out
+
+
+def _to_saved(section: str, spec: Dict[str, Any], drop: frozenset) -> Dict[str, Any]:
+    """Save-time shape of a plot/transformer spec (transformers are written params-only)."""
+    if section == "transformers":
+        params = spec.get("params")
+        return params if isinstance(params, dict) else _strip(spec, _DROP_TRANSFORMER)
+    return _strip(spec, drop)
+
 
 class ModelYAMLSource(YAMLSource):
     """YAML source with model-aware mapping for queries, plots, and transformers.
@@ -90,8 +117,36 @@ class ModelYAMLSource(YAMLSource):
     def _lift_nested_section(self, normalized: Dict[str, Dict[str, Any]], section: str) -> None:
         if "queries" not in normalized:
             return
-        bucket: Dict[str, Any] = dict(normalized.get(section, {}))
-        for qname, qspec in list(normalized.get("queries", {}).items()):
+        is_transformers = section == "transformers"
+
+        # Seed with pre-existing top-level entries, flattened to their canonical form in the same pass
+        flat: Dict[str, Any] = {}
+        for iname, ispec in normalized.get(section, {}).items():
+            if not isinstance(ispec, dict):
+                flat[iname] = ispec
+                continue
+            # Extract the original item name if it's a composite key
+            item_name = iname.split(":", 1)[1] if ":" in iname else iname
+            if is_transformers:
+                # Ensure canonical form for transformers: {'transformer': name, 'params': {...}, 'query'?: q}
+                params = (
+                    ispec.get("params") if isinstance(ispec.get("params"), dict)
+                    else _strip(ispec, _DROP_TRANSFORMER)
+                )
+                # keep query annotation if present during normalized view
+                qref = ispec.get("query")
+                transformer_name = item_name if "query" in ispec else iname
+                normalized_spec = {"transformer": str(transformer_name), "params": params}
+                if qref is not None:
+                    normalized_spec["query"] = qref
+                normalized_spec["kind"] = section
+                normalized_spec["name"] = str(item_name)
+            else:
+                normalized_spec = {"kind": section, "name": str(item_name), **ispec}
+            flat[iname] = normalized_spec
+
+        # Lift nested items directly in their final flat form
+        for qname, qspec in normalized["queries"].items():
             if not isinstance(qspec, dict):
                 continue
             q_items = qspec.pop(section, None)
@@ -100,59 +155,19 @@ class ModelYAMLSource(YAMLSource):
             for iname, ispec in q_items.items():
                 if not isinstance(ispec, dict):
                     continue
-                # For transformers, create canonical spec with transformer/name & params
-                if section == "transformers":
+                iname = str(iname)
+                if is_transformers:
                     params = (
                         ispec.get("params") if isinstance(ispec.get("params"), dict)
                         else {k: v for k, v in ispec.items() if k not in ("kind", "name", "transformer")}
                     )
-                    out = {"transformer": str(iname), "params": params, "kind": section, "name": str(iname), "query": qname}
-                else:
-                    out = dict(ispec)
-                    out.setdefault("kind", section)
-                    out.setdefault("name", str(iname))
-                    out.setdefault("query", qname)
-                
-                # Use composite key for plots to avoid name collisions across queries
-                if section == "plots":
-                    bucket_key = f"{qname}:{str(iname)}"
+                    item_name = iname.split(":", 1)[1] if ":" in iname else iname
+                    flat[iname] = {"transformer": item_name, "params": params, "query": qname, "kind": section, "name": item_name}
                 else:
-                    bucket_key = str(iname)
-                bucket[bucket_key] = out
-        if bucket:
-            # Ensure kind/name defaults also for pre-existing top-level entries
-            flat: Dict[str, Any] = {}
-            for iname, ispec in bucket.items():
-                if not isinstance(ispec, dict):
-                    flat[iname] = ispec
-                    continue
-                normalized_spec = dict(ispec)
-                # Ensure canonical form for transformers: {'transformer': name, 'params': {...}, 'query'?: q}
-                if section == "transformers":
-                    params = (
-                        normalized_spec.get("params") if isinstance(normalized_spec.get("params"), dict)
-                        else {k: v for k, v in normalized_spec.items() if k not in ("kind", "name", "transformer", "query")}
-                    )
-                    # keep query annotation if present during normalized view
-                    qref = normalized_spec.get("query")
-                    
-                    # Extract the original transformer name if it's a composite key
-                    item_name = iname
-                    if section == "transformers" and "query" in normalized_spec and ":" in iname:
-                        _, item_name = iname.split(":", 1)
-                    
-                    normalized_spec = {"transformer": str(item_name), "params": params}
-                    if qref is not None:
-                        normalized_spec["query"] = qref
-                
-                # Extract the original item name for plots if it's a composite key
-                item_name = iname
-                if ":" in iname:
-                    _, item_name = iname.split(":", 1)
-                
-                normalized_spec.setdefault("kind", section)
-                normalized_spec.setdefault("name", str(item_name))
-                flat[iname] = normalized_spec
+                    # Build the final shape in one literal; keys present in the spec win over the defaults
+                    # Use composite key for plots to avoid name collisions across queries
+                    flat[f"{qname}:{iname}"] = {"kind": section, "name": iname, "query": qname, **ispec}
+        if flat:
             normalized[section] = flat
 
     # postprocess after base normalization (kinds -> name -> spec with kind/name filled)
@@ -164,6 +179,10 @@ class ModelYAMLSource(YAMLSource):
 
     # preprocess before saving (drop meta and optionally re-nest plots)
     def _preprocess_to_save(self, data: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        # Without queries there is nothing to re-nest or reorder: only the generic cleanup applies
+        if "queries" not in (data or {}):
+            return super()._preprocess_to_save(data)
+
         # Work on a shallow copy first, then run the generic cleanup (avoids losing hints like 'query')
         work: Dict[str, Dict[str, Any]] = {
             kind: {name: (dict(spec) if isinstance(spec, dict) else spec) for name, spec in (items or {}).items()}
@@ -172,47 +191,26 @@ class ModelYAMLSource(YAMLSource):
 
         # Helper: DRY re-nesting logic for plots and transformers on the working copy
         def _renest_section(section: str, prefer_flag: bool) -> None:
-            bucket = (work or {}).get(section, {}) or {}
-            if not (prefer_flag and bucket and "queries" in work):
+            bucket = work.get(section, {}) or {}
+            if not (prefer_flag and bucket):
                 return
             remaining: Dict[str, Any] = {}
+            nested: Dict[str, Dict[str, Any]] = {}
+            queries = work["queries"]
             for iname, ispec in bucket.items():
                 if not isinstance(ispec, dict):
                     continue
-                
-                # Extract original item name from composite key
-                item_name = iname
-                if ":" in iname:
-                    qname_from_key, item_name = iname.split(":", 1)
-                
+                # Original item name from the composite '<query>:<item>' key
+                item_name = str(iname.split(":", 1)[1] if ":" in iname else iname)
                 qname = ispec.get("query")
-                target = work["queries"].get(qname) if qname else None
-                if target:
-                    q_items = target.setdefault(section, {})
-                    if section == "transformers":
-                        # canonical params-only
-                        params = (
-                            ispec.get("params") if isinstance(ispec.get("params"), dict)
-                            else {k: v for k, v in ispec.items() if k not in ("kind", "name", "query", "transformer")}
-                        )
-                        q_items[str(item_name)] = params
-                    else:
-                        q_items[str(item_name)] = {k: v for k, v in ispec.items() if k not in ("kind", "name", "query")}
+                if qname and queries.get(qname):
+                    # grouped per query so each target section is touched once below
+                    nested.setdefault(qname, {})[item_name] = _to_saved(section, ispec, _DROP_META_QUERY)
                 else:
-                    # Extract original item name from composite key for top-level items
-                    item_name = iname
-                    if ":" in iname:
-                        _, item_name = iname.split(":", 1)
-                        
-                    # keep top-level; drop only kind/name; for transformers keep params-only at save-time
-                    if section == "transformers":
-                        params = (
-                            ispec.get("params") if isinstance(ispec.get("params"), dict)
-                            else {k: v for k, v in ispec.items() if k not in ("kind", "name", "transformer", "query")}
-                        )
-                        remaining[str(item_name)] = params
-                    else:
-                        remaining[str(item_name)] = {k: v for k, v in ispec.items() if k not in ("kind", "name")}
+                    # keep top-level; drop only kind/name
+                    remaining[item_name] = _to_saved(section, ispec, _DROP_META)
+            for qname, items in nested.items():
+                queries[qname].setdefault(section, {}).update(items)
             if remaining:
                 work[section] = remaining
             else:
@@ -226,28 +224,11 @@ class ModelYAMLSource(YAMLSource):
         clean = super()._preprocess_to_save(work)
 
         # Reorder keys within each query spec to a preferred order
-        if "queries" in clean and isinstance(clean["queries"], dict):
-            desired = [
-                "dimensions",
-                "metrics",
-                "derived_metrics",
-                "transformers",
-                "having",
-                "sort",
-                "plots",
-            ]
-            for qname, qspec in list(clean["queries"].items()):
+        if isinstance(clean["queries"], dict):
+            for qname, qspec in clean["queries"].items():
                 if not isinstance(qspec, dict):
                     continue
-                ordered: Dict[str, Any] = {}
-                # place desired keys first if present
-                for key in desired:
-                    if key in qspec:
-                        ordered[key] = qspec[key]
-                # append any remaining keys preserving existing order
-                for key, val in qspec.items():
-                    if key not in ordered:
-                        ordered[key] = val
-                clean["queries"][qname] = ordered
+                # sorted() is stable, so keys outside _DESIRED_RANK preserve their existing order
+                clean["queries"][qname] = dict(sorted(qspec.items(), key=lambda kv: _DESIRED_RANK.get(kv[0], _UNRANKED)))
 
         return clean
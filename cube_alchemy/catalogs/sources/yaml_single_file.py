@@ -1,10 +1,39 @@
 from __future__ import annotations
+import copy
 import os
+from functools import lru_cache
 from pathlib import Path
 from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
 import yaml
 from ..abc import Source, Spec, Key
 
+# Prefer the libyaml-backed C loader/dumper; fall back to the pure-Python ones
+try:
+    from yaml import CSafeLoader as _SafeLoader, CSafeDumper as _SafeDumper
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeLoader as _SafeLoader, SafeDumper as _SafeDumper
+
+
+class _ModelDumper(_SafeDumper):
+    """Safe dumper that writes tuples (e.g. figsize) as plain YAML sequences."""
+
+
+_ModelDumper.add_representer(tuple, lambda dumper, data: dumper.represent_list(list(data)))
+
+def _yaml_load(data: bytes) -> Any:
+    """Parse an in-memory YAML document with the safe loader (libyaml when available)."""
+    return yaml.load(data, Loader=_SafeLoader)
+
+
+@lru_cache(maxsize=32)
+def _load_yaml_cached(path: str, mtime_ns: int, size: int) -> Any:
+    """Parse a YAML file once per (path, mtime, size); edits invalidate the entry.
+
+    Callers must not mutate the returned object (deep-copy it first).
+    """
+    # Hand the whole buffer to the parser at once instead of streaming small reads
+    return _yaml_load(Path(path).read_bytes())
+
 
 class YAMLSource(Source):
     """Generic single-file YAML source.
@@ -41,8 +70,9 @@ class YAMLSource(Source):
     # ----- core implementation -----
     def _load(self) -> Dict[str, Dict[str, Any]]:
         if self._cache is None:
-            with self.path.open("r", encoding="utf-8") as f:
-                raw = yaml.safe_load(f) or {}
+            st = self.path.stat()
+            # Copy the shared parse result: normalization below mutates specs in place
+            raw = copy.deepcopy(_load_yaml_cached(str(self.path), st.st_mtime_ns, st.st_size)) or {}
             if not isinstance(raw, dict):
                 raise ValueError("Root of YAML must be a mapping of kind -> {name -> spec}")
             normalized: Dict[str, Dict[str, Any]] = {}
@@ -86,7 +116,7 @@ class YAMLSource(Source):
         out = self._preprocess_to_save(data)
         target_path.parent.mkdir(parents=True, exist_ok=True)
         with target_path.open('w', encoding='utf-8') as f:
-            yaml.dump(out, f, default_flow_style=False, sort_keys=False, indent=2)
+            yaml.dump(out, f, Dumper=_ModelDumper, default_flow_style=False, sort_keys=False, indent=2)
         self._cache = None  # Force reload on next access
 
     def reload(self) -> None:
@@ -84,13 +84,12 @@ class CompositeBridgeGenerator:
         created_any = False
         for combo in sorted(combo_set):
             combo_list = list(combo)
-            participants = [t for t, cols in table_cols.items() if set(combo_list).issubset(cols)]
+            participants = [t for t, cols in table_cols.items() if cols.issuperset(combo)]
             if len(participants) < 2:
                 continue
 
-            # Track combo once
-            if combo_list not in self.column_combinations:
-                self.column_combinations.append(combo_list)
+            # Track combo (combos come from a set, so each one is seen exactly once)
+            self.column_combinations.append(combo_list)
 
             # Build composite df as union of distinct rows of the combo columns
             # Collect non-empty participant frames to avoid pandas concat warnings and stabilize dtypes
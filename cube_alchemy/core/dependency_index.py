@@ -1,4 +1,4 @@
-from typing import Dict, Set, Tuple
+from typing import Dict, Iterable, Set, Tuple
 
 # Dependent is a tuple of (kind, name), e.g., ('query', 'Sales by Country') or ('plot', 'Default bar')
 Dependent = Tuple[str, str]
@@ -14,32 +14,88 @@ class DependencyIndex:
 
     def __init__(self) -> None:
         self._idx: Dict[str, Set[Dependent]] = {}
+        # forward view (dependent -> sources) so removing or replacing a dependent's edges touches only its sources
+        self._sources: Dict[Dependent, Set[str]] = {}
+
+    def __setstate__(self, state: Dict) -> None:
+        self.__dict__.update(state)
+        if '_sources' not in state:
+            # older pickles only carry the reverse mapping
+            self._sources = {}
+            for source, deps in self._idx.items():
+                for dependent in deps:
+                    self._sources.setdefault(dependent, set()).add(source)
 
     def add(self, source: str, kind: str, name: str) -> None:
         if not source or not kind or not name:
             return
-        self._idx.setdefault(source, set()).add((kind, name))
+        dependent = (kind, name)
+        self._idx.setdefault(source, set()).add(dependent)
+        self._sources.setdefault(dependent, set()).add(source)
+
+    def add_many(self, sources: Iterable[str], kind: str, name: str) -> None:
+        """Add the same dependent to several sources (one shared tuple, one loop)."""
+        if not kind or not name:
+            return
+        dependent = (kind, name)
+        idx = self._idx
+        known = self._sources.setdefault(dependent, set())
+        for source in sources:
+            if source:
+                deps = idx.get(source)
+                if deps is None:
+                    deps = idx[source] = set()
+                deps.add(dependent)
+                known.add(source)
+
+    def set_sources(self, sources: Iterable[str], kind: str, name: str) -> None:
+        """Make `sources` the exact edge set of a dependent, applying only the difference to the current one."""
+        if not kind or not name:
+            return
+        dependent = (kind, name)
+        new = {source for source in sources if source}
+        old = self._sources.get(dependent, set())
+        idx = self._idx
+        for source in old - new:
+            deps = idx.get(source)
+            if deps is not None:
+                deps.discard(dependent)
+        for source in new - old:
+            deps = idx.get(source)
+            if deps is None:
+                deps = idx[source] = set()
+            deps.add(dependent)
+        self._sources[dependent] = new
 
     def get(self, source: str) -> Set[Dependent]:
         return self._idx.get(source, set())
 
     def pop(self, source: str) -> Set[Dependent]:
-        return self._idx.pop(source, set())
+        deps = self._idx.pop(source, set())
+        for dependent in deps:
+            known = self._sources.get(dependent)
+            if known is not None:
+                known.discard(source)
+        return deps
+
+    def _remove_dependent(self, target: Dependent) -> None:
+        idx = self._idx
+        for source in self._sources.pop(target, ()):
+            deps = idx.get(source)
+            if deps is not None:
+                deps.discard(target)
 
     def remove_query(self, query_name: str) -> None:
         """Remove all edges pointing to a given query."""
-        target = ('query', query_name)
-        for deps in self._idx.values():
-            deps.discard(target)
+        self._remove_dependent(('query', query_name))
 
     def remove_plot(self, plot_name: str) -> None:
         """Remove all edges pointing to a given plot."""
-        target = ('plot', plot_name)
-        for deps in self._idx.values():
-            deps.discard(target)
+        self._remove_dependent(('plot', plot_name))
 
     def clear(self) -> None:
         self._idx.clear()
+        self._sources.clear()
 
     # Debug/export helpers
     def snapshot(self) -> Dict[str, Set[Dependent]]:
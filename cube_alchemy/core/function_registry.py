@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+from types import MappingProxyType
 from typing import Any, Dict, Optional
 import importlib
 import inspect
@@ -8,15 +9,16 @@ import pandas as pd
 import numpy as np  
 
 
+# Read-only defaults shared by every registry; copied, never mutated
+_DEFAULT_REGISTERED = MappingProxyType({"pd": pd, "np": np})
+
+
 def DEFAULT_REGISTERED_FUNCTIONS() -> Dict[str, Any]:
     """Return the default function/module registry for expressions and aggregations.
 
     Kept as a function to avoid import-time side effects and allow easy extension.
     """
-    
-
-    base: Dict[str, Any] = {"pd": pd, "np": np}
-    return base
+    return dict(_DEFAULT_REGISTERED)
 
 
 class FunctionRegistry(dict):
@@ -31,6 +33,47 @@ class FunctionRegistry(dict):
 
     def __init__(self, initial: Optional[Dict[str, Any]] = None) -> None:
         super().__init__(initial or {})
+        self.version = 0
+
+    # Mutations bump `version` so cached query results can tell the registry changed
+    def _changed(self) -> None:
+        self.version = getattr(self, "version", 0) + 1
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        super().__setitem__(key, value)
+        self._changed()
+
+    def __delitem__(self, key: str) -> None:
+        super().__delitem__(key)
+        self._changed()
+
+    def update(self, *args: Any, **kwargs: Any) -> None:  # type: ignore[override]
+        super().update(*args, **kwargs)
+        self._changed()
+
+    def setdefault(self, key: str, default: Any = None) -> Any:
+        value = super().setdefault(key, default)
+        self._changed()
+        return value
+
+    def pop(self, *args: Any) -> Any:  # type: ignore[override]
+        value = super().pop(*args)
+        self._changed()
+        return value
+
+    def popitem(self) -> Any:
+        item = super().popitem()
+        self._changed()
+        return item
+
+    def clear(self) -> None:
+        super().clear()
+        self._changed()
+
+    def __ior__(self, other: Any) -> "FunctionRegistry":
+        super().__ior__(other)
+        self._changed()
+        return self
 
     # Serialization helpers
     @staticmethod
@@ -93,7 +136,7 @@ class FunctionRegistry(dict):
     # Factories
     @classmethod
     def from_defaults(cls, extra: Optional[Dict[str, Any]] = None) -> "FunctionRegistry":
-        base = DEFAULT_REGISTERED_FUNCTIONS()
+        inst = cls(_DEFAULT_REGISTERED)
         if extra:
-            base.update(extra)
-        return cls(base)
+            inst.update(extra)
+        return inst
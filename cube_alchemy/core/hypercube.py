@@ -1,4 +1,5 @@
 import logging
+import numpy as np
 import pandas as pd
 from typing import Dict, Any, Optional, Type, Union
 from pathlib import Path
@@ -72,6 +73,8 @@ class Hypercube(Logger, Engine, AnalyticsSpecs, ModelCatalog):
         try:
             # clean data if existing
             self.tables: Dict[str, pd.DataFrame] = {}
+            self._clear_fetch_caches()  # don't keep the previous tables alive through cached join indexes
+            self._state_changed()  # cached query results belong to the previous data
             self.composite_tables: Optional[Dict[str, pd.DataFrame]] = {}
             self.composite_keys: Optional[Dict[str, Any]] = {}
             self.input_tables_columns = {}
@@ -84,10 +87,9 @@ class Hypercube(Logger, Engine, AnalyticsSpecs, ModelCatalog):
 
                 self._log.info("Hypercube schema validated successfully. Loading full data..")
 
-            # Store input table columns for reference
-            reduced_input_tables, _ = self._validator._create_sample_tables(tables)
-            for table_name in reduced_input_tables:
-                self.input_tables_columns[table_name] = reduced_input_tables[table_name].columns.to_list()
+            # Store input table columns for reference (sample tables keep every column, so read them directly)
+            for table_name, table_data in tables.items():
+                self.input_tables_columns[table_name] = tuple(table_data.columns)
 
             # Schema is valid, build the actual model with full data
             bridge_generator = None
@@ -102,6 +104,7 @@ class Hypercube(Logger, Engine, AnalyticsSpecs, ModelCatalog):
                 self.composite_keys: Optional[Dict[str, Any]] = {}
 
             self.relationships: Dict[Any, Any] = {}
+            self._relationships_changed()
             self.link_tables: Dict[str, pd.DataFrame] = {}
             self.link_table_keys: list = []
             self.column_to_table: Dict[str, str] = {}
@@ -110,24 +113,36 @@ class Hypercube(Logger, Engine, AnalyticsSpecs, ModelCatalog):
                 
             self.relationships_raw = self.relationships.copy()  # Keep a raw copy of initial relationships
             self.relationships = {}
+            self._relationships_changed()
 
             # Add index columns to each table if not present
-            for table in self.tables:
+            for table, df in self.tables.items():
                 index_col = f'_index_{table}'
-                if index_col not in self.tables[table].columns:
-                    # Make a fresh, guaranteed-unique surrogate key
-                    self.tables[table].reset_index(drop=True, inplace=True)
-                    self.tables[table][index_col] = self.tables[table].index.astype('Int64')  # nullable int
+                if index_col not in df.columns:
+                    # Make a fresh, guaranteed-unique surrogate key (skip the reset when the index is already 0..n-1)
+                    idx = df.index
+                    if not (isinstance(idx, pd.RangeIndex) and idx.start == 0 and idx.step == 1):
+                        df.reset_index(drop=True, inplace=True)
+                    # Build the key in one allocation and append it without a __setitem__ consolidation;
+                    # the narrowest width that holds the row count cuts the memory moved by the core joins
+                    n = len(df)
+                    index_dtype = 'Int16' if n < 2**15 else 'Int32' if n < 2**31 else 'Int64'
+                    df.insert(len(df.columns), index_col, pd.array(np.arange(n, dtype=index_dtype.lower()), dtype=index_dtype))  # nullable int
             
             # Create link tables for shared columns and update the original tables
             self._create_link_tables()  # Link tables are used to join tables on shared columns
 
             # Build the column-to-table mapping
             self._build_column_to_table_mapping()  # Map each column to its source table
+            self._invalidate_dimensions_cache()  # Table columns are final from here on
 
             # Automatically add relationships based on shared column names
-            self._add_auto_relationships()  # Add relationships for columns with the same name
+            # After linking, shared columns only exist between link tables and their source tables
+            self._add_auto_relationships(tables=self.link_tables)  # Add relationships for columns with the same name
 
+            # Cycles are defined on the linked graph, so this can't run before _create_link_tables
+            # (the raw graph turns every column shared by 3+ tables into a false cycle). Stop here,
+            # before the join mapping and trajectory merges; the link tables are kept for visualize_graph.
             self.is_cyclic = self._has_cyclic_relationships()
             if self.is_cyclic[0]:
                 return None #no need to continue, there are cycle relationships
@@ -1,7 +1,18 @@
 from typing import List, Dict, Any, Optional, Union, Callable, Tuple
-from ..metric import Metric, DerivedMetric, extract_columns
+from ..metric import Metric, DerivedMetric, _extract_columns_cached
+from .engine import _intern
+import copy
 import re
 import warnings
+from collections import deque
+from itertools import chain
+
+# Internal columns hidden from get_dimensions(): surrogate keys/indexes and renamed '<table>' originals
+_HIDDEN_COLUMN_PREFIXES = ('_index_', '_key_', '_composite_key_')
+_HIDDEN_COLUMN_RE = re.compile(r'<.*>')
+
+# Sentinel for exhausted iterators in the explicit-stack dependency walks
+_EXHAUSTED = object()
 
 class AnalyticsSpecs:
     
@@ -31,29 +42,45 @@ class AnalyticsSpecs:
             nested,
         )
 
-        # define metric column indexes. To be used on queries to traverse the tree
-        metric_tables: set[str] = set()
-        metric_columns_indexes: set[str] = set()
-
+        # single pass over the metric columns: owning tables (ordered, unique) and unknown columns
+        column_to_table = self.column_to_table
+        metric_tables: Dict[str, None] = {}
+        missing_columns: List[str] = []
         for column in new_metric.columns:
-            table_name = self.column_to_table.get(column)
-            if table_name:
-                metric_tables.add(table_name)
-            else:
-                warnings.warn(f"Column {column} not found in any table.")
-
-        metric_tables_dict = {tname: self.tables[tname] for tname in metric_tables if tname is not None}
-        trajectory_tables = self._find_complete_trajectory(metric_tables_dict)
-
-        for tname in trajectory_tables:
-            if tname not in self.link_tables:
-                metric_columns_indexes.add(f"_index_{tname}")
+            tname = column_to_table.get(column)
+            if not tname:
+                missing_columns.append(column)
+            elif tname not in metric_tables:
+                metric_tables[tname] = None
+        if missing_columns:
+            # one warning per metric rather than one per unknown column
+            warnings.warn(f"Columns not found in any table: {', '.join(missing_columns)}.")
+
+        # Metrics over the same tables share a trajectory; memoize it until the tables or relationships change
+        version = (getattr(self, '_tables_version', 0), getattr(self, '_relationships_version', 0))
+        if getattr(self, '_trajectory_cache_version', None) != version:
+            self._trajectory_cache: Dict[frozenset, Tuple[str, ...]] = {}
+            self._trajectory_cache_version = version
+        trajectory_key = frozenset(metric_tables)
+        trajectory_tables = self._trajectory_cache.get(trajectory_key)
+        if trajectory_tables is None:
+            tables = self.tables
+            metric_tables_dict = {tname: tables[tname] for tname in metric_tables}
+            trajectory_tables = tuple(self._find_complete_trajectory(metric_tables_dict))
+            self._trajectory_cache[trajectory_key] = trajectory_tables
 
-        # add metric_columns_indexes to the new metric object
-        new_metric.columns_indexes = list(metric_columns_indexes)
+        # define metric column indexes. To be used on queries to traverse the tree
+        link_tables = self.link_tables
+        new_metric.columns_indexes = list(dict.fromkeys(
+            f"_index_{tname}" for tname in trajectory_tables if tname not in link_tables
+        ))
         self.metrics[new_metric.name] = new_metric
+        self._bump_spec_version('metrics', new_metric.name)
 
-        new_metric.query_relevant_columns = list(set(new_metric.nested_dimensions + new_metric.columns + new_metric.columns_indexes))
+        # one ordered dedupe pass, no intermediate concatenated list
+        new_metric.query_relevant_columns = list(dict.fromkeys(
+            chain(new_metric.nested_dimensions, new_metric.columns, new_metric.columns_indexes)
+        ))
 
         # Register and refresh dependents (queries referencing this metric, even if previously missing)
         self._refresh_queries_dependent_on(new_metric.name, is_derived_metric=False)
@@ -70,25 +97,91 @@ class AnalyticsSpecs:
         if not isinstance(expression, str) or not expression:
             raise ValueError("Derived metric requires a non-empty string expression.")
 
-        self.derived_metrics[name] = DerivedMetric(name=name, expression=expression, fillna=fillna)
+        previous = self.derived_metrics.get(name)
+        new_derived_metric = DerivedMetric(name=name, expression=expression, fillna=fillna)
+        name = new_derived_metric.name
+        self.derived_metrics[name] = new_derived_metric
+        self._bump_spec_version('derived_metrics', name)
+
+        # Query plans only depend on the names a derived metric references (expression and fillna are read
+        # at execution time), so a redefinition referencing the same columns leaves every dependent plan as is.
+        if previous is not None and previous.columns == new_derived_metric.columns:
+            return
 
         # Register and refresh dependents (queries referencing this derived metric, even if previously missing)
         self._refresh_queries_dependent_on(name, is_derived_metric=True)
         # Targeted refresh handled by dependency index
 
+    def _bump_spec_version(self, kind: str, name: Optional[str] = None) -> None:
+        """Mark caches built from a spec registry ('metrics', 'derived_metrics', 'queries') stale.
+
+        Must be called whenever that registry changes. Pass the name of the entry that changed so caches
+        keyed on single entries (see _spec_item_version) only drop what depends on it.
+        """
+        versions = getattr(self, '_spec_versions', None)
+        if versions is None:
+            versions = self._spec_versions = {}
+        version = versions[kind] = versions.get(kind, 0) + 1
+        if name is not None:
+            item_versions = getattr(self, '_spec_item_versions', None)
+            if item_versions is None:
+                item_versions = self._spec_item_versions = {}
+            # the registry version is monotonic, so a deleted and redefined entry never repeats a version
+            item_versions[(kind, name)] = version
+
+    def _spec_version(self, kind: str) -> int:
+        return getattr(self, '_spec_versions', {}).get(kind, 0)
+
+    def _spec_item_version(self, kind: str, name: str) -> int:
+        """Registry version at which the named entry last changed (0 if it never did)."""
+        return getattr(self, '_spec_item_versions', {}).get((kind, name), 0)
+
+    def _cached_snapshot(self, kind: str, build: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        """Return a copy of the formatted view of a registry, rebuilt only when its version changes.
+
+        Callers own the result: every item is a fresh dict and its list/dict/set values are fresh containers,
+        so editing an item or one of its lists does not leak into later snapshots. Values are copied one level
+        deep only (a full deepcopy per call costs far more than rebuilding the view).
+        """
+        cache = getattr(self, '_snapshot_cache', None)
+        if cache is None:
+            cache = self._snapshot_cache = {}
+        version = self._spec_version(kind)
+        hit = cache.get(kind)
+        if hit is None or hit[0] != version:
+            # remember which keys of each item hold containers, so copies skip the type checks
+            entries = [
+                (name, item, tuple(k for k, v in item.items() if isinstance(v, (list, dict, set))))
+                for name, item in build().items()
+            ]
+            hit = cache[kind] = (version, entries)
+        snapshot: Dict[str, Any] = {}
+        for name, item, container_keys in hit[1]:
+            item = snapshot[name] = item.copy()
+            for k in container_keys:
+                item[k] = item[k].copy()
+        return snapshot
+
     def define_query(
         self,
         name: str,
-        dimensions: set[str] = {},
-        metrics: List[str] = [],
-        derived_metrics: List[str] = [],
+        dimensions: Optional[Union[List[str], set[str]]] = None,
+        metrics: Optional[List[str]] = None,
+        derived_metrics: Optional[List[str]] = None,
         having: Optional[str] = None,
-        sort: List[Tuple[str, str]] = [],        
+        sort: Optional[List[Tuple[str, str]]] = None,
         drop_null_dimensions: bool = False,
         drop_null_metric_results: bool = False,
     ):
-        # Normalize dimensions to list but preserve provided order if it's already a list
-        dimensions = list(dimensions)
+        # Normalize dimensions to list but preserve provided order (always a copy: the stored spec must not
+        # follow later edits to the caller's list)
+        dimensions = list(dimensions) if dimensions is not None else []
+        sort = list(sort) if sort is not None else []
+        # Intern the names (often fresh strings parsed from YAML) so registry lookups can match by identity
+        # (only exact str can be interned; subclasses such as numpy.str_ are kept as given)
+        name = _intern(name)
+        metrics = [_intern(m) for m in metrics] if metrics else []
+        derived_metrics = [_intern(m) for m in derived_metrics] if derived_metrics else []
 
         # Validate metric names exist now, but store only names to keep linkage live
         for metric_name in metrics:
@@ -101,185 +194,173 @@ class AnalyticsSpecs:
                     f"Derived metric '{derived_metrics_name}' is not defined when defining query '{name}'. Define it with define_derived_metric()."
                 )
         
-        having_columns: List[str] = extract_columns(having) if having else []
-
-        # --- Precompute hidden (internal) base metrics required ---
-        hidden_metrics: List[str] = []
+        # the memoized tuple is shared as-is: it is only read here and stored frozen on the query
+        having_columns: Tuple[str, ...] = _extract_columns_cached(having) if having else ()
+
+        # Set views for O(1) membership; hidden names are collected in insertion-ordered dicts (ordered sets)
+        metrics_set = set(metrics)
+        derived_metrics_set = set(derived_metrics)
+        # Resolved once for the whole definition (registries and schema don't change while we run)
+        defined_names = self.metrics.keys() | self.derived_metrics.keys()
+        dimensions_set = self._cached_dimensions()[1]
+
+        # --- Precompute hidden (internal) base and derived metrics required ---
+        # Any metric referenced by requested derived metrics, HAVING, or SORT that was not requested itself
+        base_specs = self.metrics
+        derived_specs = self.derived_metrics
+        hidden_metrics_d: Dict[str, None] = {}
+        hidden_derived_metrics_d: Dict[str, None] = {}
         
         # Helper function to recursively collect all base metrics needed by a derived metric
-        def collect_base_metrics(derived_metric_name: str, collected_metrics: List[str] = None, visited: set[str] = None):
-            if collected_metrics is None:
-                collected_metrics = []
-            if visited is None:
-                visited = set()
-                
-            # Avoid infinite recursion if there are circular dependencies
-            if derived_metric_name in visited:
-                return collected_metrics
-            visited.add(derived_metric_name)
-            
-            if derived_metric_name not in self.derived_metrics:
-                return collected_metrics
-                
-            # Get columns referenced by this derived metric
-            for col in self.derived_metrics[derived_metric_name].columns:
+        # (explicit stack of column iterators: same visiting order as recursion, no recursion-limit risk)
+        def collect_base_metrics(derived_metric_name: str, collected_metrics: Dict[str, None]):
+            if derived_metric_name not in derived_specs:
+                return
+            # visited avoids infinite loops if there are circular dependencies
+            visited = {derived_metric_name}
+            stack = [iter(derived_specs[derived_metric_name].columns)]
+            while stack:
+                col = next(stack[-1], _EXHAUSTED)
+                if col is _EXHAUSTED:
+                    stack.pop()
                 # If it's a base metric, add it
-                if col in self.metrics and col not in metrics and col not in collected_metrics:
-                    collected_metrics.append(col)
-                # If it's another derived metric, recursively process it
-                elif col in self.derived_metrics:
-                    collect_base_metrics(col, collected_metrics, visited)
-            
-            return collected_metrics
-        
-        # From derived metrics' expressions (with recursive dependency resolution)
-        for cm_name in derived_metrics:
-            collect_base_metrics(cm_name, hidden_metrics)
-            
-        # From HAVING expression referenced columns
-        for col in having_columns:
-            if col in self.metrics and col not in metrics and col not in hidden_metrics:
-                hidden_metrics.append(col)
-            # Also handle derived metrics in HAVING
-            elif col in self.derived_metrics and col not in derived_metrics:
-                collect_base_metrics(col, hidden_metrics)
-                
-        # From SORT columns
-        for sort_col, _dir in sort:
-            if sort_col in self.metrics and sort_col not in metrics and sort_col not in hidden_metrics:
-                hidden_metrics.append(sort_col)
-            # Also handle derived metrics in SORT
-            elif sort_col in self.derived_metrics and sort_col not in derived_metrics:
-                collect_base_metrics(sort_col, hidden_metrics)
-
-        # --- Precompute hidden derived metrics and dependency order ---
-        # Any derived metric referenced by requested derived metrics, HAVING, or SORT
-        hidden_derived_metrics: List[str] = []
-        referenced_computed: set[str] = set()
-        
+                elif col in base_specs and col not in metrics_set and col not in collected_metrics:
+                    collected_metrics[col] = None
+                # If it's another derived metric, descend into it
+                elif col in derived_specs and col not in visited:
+                    visited.add(col)
+                    stack.append(iter(derived_specs[col].columns))
+
         # Helper function to recursively collect all derived metrics needed by another derived metric
-        def collect_derived_metrics(derived_metric_name: str, collected_metrics: List[str], visited: set[str] = None):
-            if visited is None:
-                visited = set()
-                
-            # Avoid infinite recursion if there are circular dependencies
-            if derived_metric_name in visited:
-                return
-            visited.add(derived_metric_name)
-            
-            if derived_metric_name not in self.derived_metrics:
+        # (explicit stack, as above; unlike the base walk it stops at requested or already collected names)
+        def collect_derived_metrics(derived_metric_name: str, collected_metrics: Dict[str, None]):
+            if derived_metric_name not in derived_specs:
                 return
-                
-            # Get columns referenced by this derived metric
-            for col in self.derived_metrics[derived_metric_name].columns:
-                # If it's another derived metric and not already included, add it and recursively process it
-                if col in self.derived_metrics and col not in derived_metrics and col not in collected_metrics:
-                    collected_metrics.append(col)
-                    referenced_computed.add(col)
-                    collect_derived_metrics(col, collected_metrics, visited)
-            
+            # visited avoids infinite loops if there are circular dependencies
+            visited = {derived_metric_name}
+            stack = [iter(derived_specs[derived_metric_name].columns)]
+            while stack:
+                col = next(stack[-1], _EXHAUSTED)
+                if col is _EXHAUSTED:
+                    stack.pop()
+                # If it's another derived metric and not already included, add it and descend into it
+                elif col in derived_specs and col not in derived_metrics_set and col not in collected_metrics:
+                    collected_metrics[col] = None
+                    if col not in visited:
+                        visited.add(col)
+                        stack.append(iter(derived_specs[col].columns))
+
+        # One loop per source; the base and derived collections are independent, so each one sees
+        # exactly the same sequence of additions as if the sources were walked separately for it.
         # From derived metrics' expressions (with recursive dependency resolution)
         for cm_name in derived_metrics:
-            if cm_name in self.derived_metrics:
-                collect_derived_metrics(cm_name, hidden_derived_metrics)
-                
-        # From HAVING expression referenced columns
-        for col in having_columns:
-            if col in self.derived_metrics and col not in derived_metrics and col not in hidden_derived_metrics:
-                hidden_derived_metrics.append(col)
-                referenced_computed.add(col)
-                collect_derived_metrics(col, hidden_derived_metrics)
-                
-        # From SORT columns
-        for sort_col, _dir in sort:
-            if sort_col in self.derived_metrics and sort_col not in derived_metrics and sort_col not in hidden_derived_metrics:
-                hidden_derived_metrics.append(sort_col)
-                referenced_computed.add(sort_col)
-                collect_derived_metrics(sort_col, hidden_derived_metrics)
+            collect_base_metrics(cm_name, hidden_metrics_d)
+            collect_derived_metrics(cm_name, hidden_derived_metrics_d)
+
+        # From HAVING expression referenced columns, then SORT columns
+        for col in chain(having_columns, (sort_col for sort_col, _dir in sort)):
+            if col in base_specs and col not in metrics_set and col not in hidden_metrics_d:
+                hidden_metrics_d[col] = None
+            # Also handle derived metrics in HAVING/SORT
+            elif col in derived_specs and col not in derived_metrics_set:
+                collect_base_metrics(col, hidden_metrics_d)
+            if col in derived_specs and col not in derived_metrics_set and col not in hidden_derived_metrics_d:
+                hidden_derived_metrics_d[col] = None
+                collect_derived_metrics(col, hidden_derived_metrics_d)
+
+        hidden_metrics: List[str] = list(hidden_metrics_d)
+        hidden_derived_metrics: List[str] = list(hidden_derived_metrics_d)
 
         # Build dependency graph for all derived metrics involved in this query (we need to execute them in order to work)
-        def build_cm_dependencies(names: List[str]) -> Dict[str, List[str]]:
-            deps: Dict[str, List[str]] = {}
+        def build_cm_dependencies(names: List[str]) -> Dict[str, Tuple[str, ...]]:
+            version = self._spec_version('derived_metrics')
+            registry = self.derived_metrics
+            deps: Dict[str, Tuple[str, ...]] = {}
             for n in names:
-                if n not in self.derived_metrics:
+                cm = registry.get(n)
+                if cm is None:
                     continue
-                cm = self.derived_metrics[n]
-                # dependencies are other derived metric names referenced in expression
-                deps[n] = [c for c in cm.columns if c in self.derived_metrics]
+                # dependencies are other derived metric names referenced in expression;
+                # they only change when the derived metrics registry does, so reuse them until then
+                if getattr(cm, '_derived_deps_version', None) != version:
+                    cm._derived_deps = tuple(c for c in cm.columns if c in registry)
+                    cm._derived_deps_version = version
+                deps[n] = cm._derived_deps
             return deps
 
-        # the set of derived metrics that might need evaluation
-        all_cm_names: List[str] = []
-        for n in derived_metrics + hidden_derived_metrics:
-            if n not in all_cm_names:
-                all_cm_names.append(n)
+        # the set of derived metrics that might need evaluation (deduplicated, first occurrence wins)
+        all_cm_names: List[str] = list(dict.fromkeys(chain(derived_metrics, hidden_derived_metrics_d)))
         cm_deps = build_cm_dependencies(all_cm_names)
 
-        # Topologically sort derived metrics to a safe evaluation order
-        derived_metrics_ordered: List[str] = []
-        temp_mark: set[str] = set()
-        perm_mark: set[str] = set()
-
-        def visit(node: str):
-            if node in perm_mark:
-                return
-            if node in temp_mark:
-                raise ValueError(f"Cycle detected in derived metrics dependencies involving '{node}'.")
-            temp_mark.add(node)
-            for d in cm_deps.get(node, []):
-                visit(d)
-            temp_mark.remove(node)
-            perm_mark.add(node)
-            if node not in derived_metrics_ordered:
+        # Topologically sort derived metrics to a safe evaluation order (Kahn's algorithm, iterative)
+        derived_metrics_ordered: List[str]
+        if not any(cm_deps.values()):
+            # no derived metric references another one: the candidate order is already valid
+            derived_metrics_ordered = all_cm_names
+        else:
+            in_degree: Dict[str, int] = {n: 0 for n in all_cm_names}
+            dependents: Dict[str, List[str]] = {n: [] for n in all_cm_names}
+            for node, node_deps in cm_deps.items():
+                for d in node_deps:
+                    if d in in_degree:
+                        in_degree[node] += 1
+                        dependents[d].append(node)
+
+            ready = deque(n for n in all_cm_names if in_degree[n] == 0)
+            derived_metrics_ordered = []
+            while ready:
+                node = ready.popleft()
                 derived_metrics_ordered.append(node)
-
-        for node in all_cm_names:
-            visit(node)
-
-        # Build the set of referenced names to track missing items for fast auto-refresh.
-        all_used_columns = set(metrics) | set(derived_metrics)
-        # From derived metrics expressions (only those that exist at the moment)
-        for cm_name in derived_metrics:
-            cm_obj = self.derived_metrics.get(cm_name)
-            if cm_obj:
-                for col in cm_obj.columns:
-                    all_used_columns.add(col)
-        # From HAVING and SORT
-        for col in having_columns:
-            all_used_columns.add(col)
-        for sc, _ in sort:
-            all_used_columns.add(sc)
-
-        # Only consider tokens that are NOT dimensions and are plausible metric/derived metric names.
-        missing_column_names = sorted([n for n in all_used_columns if n not in self.metrics and n not in self.derived_metrics and n not in self.get_dimensions()])
+                for dependent in dependents[node]:
+                    in_degree[dependent] -= 1
+                    if in_degree[dependent] == 0:
+                        ready.append(dependent)
+
+            if len(derived_metrics_ordered) != len(all_cm_names):
+                remaining = [n for n in all_cm_names if in_degree[n] > 0]
+                raise ValueError(f"Cycle detected in derived metrics dependencies involving {', '.join(repr(n) for n in remaining)}.")
+
+        # One pass over every referenced name (requested metrics, existing derived metrics' expressions,
+        # HAVING and SORT): resolved names feed the dependency sources, unresolved non-dimensions are
+        # tracked as missing for fast auto-refresh.
+        referenced_names = chain(
+            metrics,
+            derived_metrics,
+            chain.from_iterable(self.derived_metrics[n].columns for n in derived_metrics if n in self.derived_metrics),
+            having_columns,
+            (sort_col for sort_col, _ in sort),
+        )
+        resolved_names: set[str] = set()
+        missing_names: set[str] = set()
+        for ref in referenced_names:
+            if ref in defined_names:
+                resolved_names.add(ref)
+            elif ref not in dimensions_set:
+                missing_names.add(ref)
+        missing_column_names = sorted(missing_names)
 
         # Register dependency edges for targeted refreshes
         try:
             if hasattr(self, '_dep_index') and self._dep_index is not None:
-                # Remove old edges pointing to this query to avoid accumulation
-                self._dep_index.remove_query(name)
+                # Replace this query's edges (only the difference to the previous definition is applied)
                 # Sources:
                 # - explicit + hidden base metrics
                 # - explicit + hidden derived metrics
-                dep_sources = set(metrics) | set(hidden_metrics) | set(derived_metrics) | set(hidden_derived_metrics)
-
-                # Include HAVING/SORT tokens only if they resolve to existing metric/derived metric names.
-                # Missing HAVING/SORT tokens will be captured via missing_column_names below.
-                for col in having_columns:
-                    if col in self.metrics or col in self.derived_metrics:
-                        dep_sources.add(col)
-                for sort_col, _ in sort:
-                    if sort_col in self.metrics or sort_col in self.derived_metrics:
-                        dep_sources.add(sort_col)
-
-                # Add unresolved tokens (not metrics, not derived metrics, not dimensions)
-                dep_sources |= set(missing_column_names)
-                for src in dep_sources:
-                    self._dep_index.add(src, 'query', name)
+                # - every referenced name that resolves to a metric/derived metric (incl. HAVING/SORT tokens)
+                # - unresolved tokens (not metrics, not derived metrics, not dimensions)
+                dep_sources: set[str] = set()
+                dep_sources.update(metrics, hidden_metrics, derived_metrics, hidden_derived_metrics, resolved_names, missing_names)
+                self._dep_index.set_sources(dep_sources, 'query', name)
         except Exception as _:
             # Non-fatal if dependency registration fails
             pass
 
+        previous = self.queries.get(name)
+        self._bump_spec_version('queries', name)
+        pending = getattr(self, '_pending_query_refresh', None)
+        if pending is not None:
+            # this definition already reflects every metric recorded for it so far in the open batch
+            pending.pop(name, None)
         self.queries[name] = {
             "dimensions": dimensions,
             "metrics": metrics,
@@ -288,27 +369,35 @@ class AnalyticsSpecs:
             "having_columns": having_columns,
             "sort": sort,
 
-            # Precomputed internal helpers to avoid recomputation at runtime
-            "hidden_metrics": hidden_metrics,
-            "hidden_derived_metrics": hidden_derived_metrics,
+            # Precomputed internal helpers to avoid recomputation at runtime (frozen: read-only after definition)
+            "hidden_metrics": tuple(hidden_metrics),
+            "hidden_derived_metrics": tuple(hidden_derived_metrics),
 
             # Full ordered list to evaluate (requested + hidden, in dependency order)
-            "derived_metrics_ordered": derived_metrics_ordered,
+            "derived_metrics_ordered": tuple(derived_metrics_ordered),
 
             "drop_null_dimensions": drop_null_dimensions,
             "drop_null_metric_results": drop_null_metric_results,
             # Tracking for fast re-definition when missing items get defined later
-            "missing_column_names": missing_column_names,
+            "missing_column_names": tuple(missing_column_names),
         }
 
         # if there exists a plot configured with this query, we might need to update it
-        q_state = getattr(self, 'plotting_components', {}).get(name)
-        if q_state and q_state.get('plots'):
+        # (plot configs are derived from the query dimensions and metrics only; refreshes usually keep both.
+        # The stored lists are private copies, so this compares the previous definition with the new inputs.)
+        plot_inputs_unchanged = (
+            previous is not None
+            and previous.get("dimensions") == dimensions
+            and previous.get("metrics") == metrics
+            and previous.get("derived_metrics") == derived_metrics
+        )
+        q_state = self.plotting_components.get(name)
+        if q_state and q_state.get('plots') and not plot_inputs_unchanged:
             self.log().info("Plots configuration for query '%s' will be updated due to query re-definition.", name)
             # Remove existing edges query->plot to avoid stale duplicates
             try:
                 if hasattr(self, '_dep_index') and self._dep_index is not None:
-                    for plot_name in list(q_state['plots'].keys()):
+                    for plot_name in q_state['plots']:
                         self._dep_index.remove_plot(plot_name)
             except Exception:
                 pass
@@ -327,79 +416,145 @@ class AnalyticsSpecs:
                 )
 
     def _refresh_queries_dependent_on(self, metric_name: str, is_derived_metric: bool) -> None:
-        """Refresh queries that depend on the given metric/derived metric using the dependency index."""
+        """Refresh queries that depend on the given metric/derived metric using the dependency index.
+
+        While a batch is open (see _defer_query_refresh) the affected queries are only recorded.
+        """
         try:
             index = getattr(self, '_dep_index', None)
             if not index:
                 return
+            # Snapshot required: define_query below rewrites this very edge set while we iterate
             dependents = list(index.get(metric_name))
             if not dependents:
                 return
+            pending = getattr(self, '_pending_query_refresh', None)
             for kind, qname in dependents:
                 if kind != 'query':
                     continue
-                q = self.queries.get(qname)
-                if not q:
-                    continue
-                metric_type = 'computed' if is_derived_metric else 'base'
-                self.log().info(
-                    "Query '%s' auto-refreshed due to newly defined %s metric '%s'.",
-                    qname, metric_type, metric_name
-                )
-                self.define_query(
-                    name=qname,
-                    dimensions=q.get("dimensions", []),
-                    metrics=q.get("metrics", []),
-                    derived_metrics=q.get("derived_metrics", []),
-                    having=q.get("having"),
-                    sort=q.get("sort", []),
-                    drop_null_dimensions=q.get("drop_null_dimensions", False),
-                    drop_null_metric_results=q.get("drop_null_metric_results", False),
-                )
+                if pending is not None:
+                    pending.setdefault(qname, []).append((metric_name, is_derived_metric))
+                else:
+                    self._refresh_query(qname, [(metric_name, is_derived_metric)])
         except Exception as e:
             if len(getattr(self, 'queries', {})) > 0:
                 self.log().warning("Failed to auto-refresh dependents for '%s': %s", metric_name, e)
 
-    def get_dimensions(self) -> List[str]:
+    def _refresh_query(self, qname: str, triggers: List[Tuple[str, bool]]) -> None:
+        """Bring one query up to date after the (metric name, is derived) triggers were (re)defined."""
+        q = self.queries.get(qname)
+        if not q:
+            return
+        missing = q.get("missing_column_names", ())
+        # A query stores base metrics by name only, so (re)defining one it already resolved leaves
+        # its plan unchanged. Derived metrics always rebuild: a new expression can change dependencies.
+        triggers = [(n, is_derived) for n, is_derived in triggers if is_derived or n in missing]
+        if not triggers:
+            return
+        # Fast path: a requested base metric is never hidden and feeds no derived ordering, so the plan
+        # only loses the name from its missing list (dependency edges already cover missing names).
+        requested = q.get("metrics", ())
+        if all(not is_derived and n in requested for n, is_derived in triggers):
+            resolved = {n for n, _ in triggers}
+            q["missing_column_names"] = tuple(n for n in missing if n not in resolved)
+            self._bump_spec_version('queries', qname)
+            for n in resolved:
+                self.log().info("Query '%s' resolved previously missing base metric '%s'.", qname, n)
+            return
+        for n, is_derived in triggers:
+            metric_type = 'computed' if is_derived else 'base'
+            self.log().info(
+                "Query '%s' auto-refreshed due to newly defined %s metric '%s'.",
+                qname, metric_type, n
+            )
+        self.define_query(
+            name=qname,
+            dimensions=q.get("dimensions", []),
+            metrics=q.get("metrics", []),
+            derived_metrics=q.get("derived_metrics", []),
+            having=q.get("having"),
+            sort=q.get("sort", []),
+            drop_null_dimensions=q.get("drop_null_dimensions", False),
+            drop_null_metric_results=q.get("drop_null_metric_results", False),
+        )
+
+    def _defer_query_refresh(self) -> bool:
+        """Start collecting dependent query refreshes instead of running them per definition.
+
+        Returns False when a batch is already open (the outer caller flushes it).
+        """
+        if getattr(self, '_pending_query_refresh', None) is not None:
+            return False
+        self._pending_query_refresh: Optional[Dict[str, List[Tuple[str, bool]]]] = {}
+        return True
+
+    def _flush_query_refresh(self) -> None:
+        """Close the batch and refresh every affected query once."""
+        pending = getattr(self, '_pending_query_refresh', None)
+        self._pending_query_refresh = None
+        for qname, triggers in (pending or {}).items():
+            try:
+                self._refresh_query(qname, triggers)
+            except Exception as e:
+                self.log().warning("Failed to auto-refresh query '%s': %s", qname, e)
+
+    def _invalidate_dimensions_cache(self) -> None:
+        """Mark cached dimensions stale. Must be called by anything that changes self.tables or their columns."""
+        self._tables_version = getattr(self, '_tables_version', 0) + 1
+        self._state_changed()  # query results computed from the old tables are stale too
+
+    def _cached_dimensions(self) -> Tuple[Tuple[str, ...], frozenset]:
+        """Sorted dimensions and their set view, rebuilt only when the tables version changes."""
+        # the schema is static between loads, while dimensions are consulted on every define_query
+        version = getattr(self, '_tables_version', 0)
+        cached = getattr(self, '_dimensions_cache', None)
+        if isinstance(cached, tuple) and getattr(self, '_dimensions_cache_version', None) == version:
+            return cached
+
         dimensions = set()
         for table_name, table in self.tables.items():
             dimensions.update(
                 col for col in table.columns 
                 if not (
-                    col.startswith('_index_') or 
-                    col.startswith('_key_') or 
-                    col.startswith('_composite_key_') or
+                    col.startswith(_HIDDEN_COLUMN_PREFIXES) or
                     #re.search(r'<_composite_', col)
-                    re.search(r'<.*>', col)
+                    # cheap substring test first; most names never reach the regex engine
+                    ('<' in col and _HIDDEN_COLUMN_RE.search(col))
                 )
             )
-        return sorted(list(dimensions))
+        self._dimensions_cache = (tuple(sorted(dimensions)), frozenset(dimensions))
+        self._dimensions_cache_version = version
+        return self._dimensions_cache
+
+    def get_dimensions(self) -> List[str]:
+        return list(self._cached_dimensions()[0])
 
     def get_queries(self) -> Dict[str, Any]:
-        queries_formatted: Dict[str, Any] = {}
-        for name, q in self.queries.items():
-            queries_formatted[name] = {
-                "dimensions": q.get('dimensions', []),
-                "metrics": q.get('metrics', []),
-                "derived_metrics": q.get('derived_metrics', []),
-                "having": q.get('having'),
-                "sort": q.get('sort'),                
-                "drop_null_dimensions": q.get('drop_null_dimensions', False),
-                "drop_null_metric_results": q.get('drop_null_metric_results', False),
-            }
-        return queries_formatted
+        def build() -> Dict[str, Any]:
+            queries_formatted: Dict[str, Any] = {}
+            for name, q in self.queries.items():
+                queries_formatted[name] = {
+                    "dimensions": q.get('dimensions', []),
+                    "metrics": q.get('metrics', []),
+                    "derived_metrics": q.get('derived_metrics', []),
+                    "having": q.get('having'),
+                    "sort": q.get('sort'),                
+                    "drop_null_dimensions": q.get('drop_null_dimensions', False),
+                    "drop_null_metric_results": q.get('drop_null_metric_results', False),
+                }
+            return queries_formatted
+        return self._cached_snapshot('queries', build)
     
     def get_metrics(self) -> Dict[str, Any]:
-        metrics_formatted = {}
-        for metric_name, metric in self.metrics.items():
-            metrics_formatted[metric_name] = metric.get_metric_details()
-        return metrics_formatted 
+        def build() -> Dict[str, Any]:
+            # get_metric_details may call inspect.getsource for callable aggregations, so this is worth caching
+            return {metric_name: metric.get_metric_details() for metric_name, metric in self.metrics.items()}
+        return self._cached_snapshot('metrics', build)
 
     def get_derived_metrics(self) -> Dict[str, Any]:
-        derived_metrics_formatted = {}
-        for metric_name, metric in self.derived_metrics.items():
-            derived_metrics_formatted[metric_name] = metric.get_derived_metric_details()
-        return derived_metrics_formatted
+        def build() -> Dict[str, Any]:
+            return {metric_name: metric.get_derived_metric_details() for metric_name, metric in self.derived_metrics.items()}
+        return self._cached_snapshot('derived_metrics', build)
     
     def get_metric(self, metric:str) -> Dict[str, Any]:
         return self.metrics[metric].get_metric_details()
@@ -425,6 +580,7 @@ class AnalyticsSpecs:
         """Remove a query definition and its dependency edges."""
         if name in self.queries:
             self.queries.pop(name, None)
+            self._bump_spec_version('queries', name)
     # No legacy reverse index to clean
         # Clean dependency edges
         try:
@@ -434,9 +590,9 @@ class AnalyticsSpecs:
             pass
         # Remove plotting configs tied to this query, and their edges
         try:
-            qstate = getattr(self, 'plotting_components', {}).pop(name, None)
+            qstate = self.plotting_components.pop(name, None)
             if qstate and 'plots' in qstate:
-                for plot_name in list(qstate['plots'].keys()):
+                for plot_name in qstate['plots']:
                     if hasattr(self, '_dep_index') and self._dep_index is not None:
                         self._dep_index.remove_plot(plot_name)
         except Exception:
@@ -444,12 +600,14 @@ class AnalyticsSpecs:
 
     def delete_metric(self, name: str) -> None:
         """Remove a base metric; dependent queries will still reference the name and be marked missing until redefined."""
-        self.metrics.pop(name, None)
+        if self.metrics.pop(name, None) is not None:
+            self._bump_spec_version('metrics', name)
         # No reverse-refresh on deletion; edges remain from name->query for future redefinition
 
     def delete_derived_metric(self, name: str) -> None:
         """Remove a derived metric; dependent queries will still reference the name and be marked missing until redefined."""
-        self.derived_metrics.pop(name, None)
+        if self.derived_metrics.pop(name, None) is not None:
+            self._bump_spec_version('derived_metrics', name)
         # No reverse-refresh on deletion
 
     def debug_dependencies(self) -> Dict[str, Any]:
@@ -475,7 +633,7 @@ class AnalyticsSpecs:
         try:
             if hasattr(self, '_dep_index') and self._dep_index is not None:
                 snap = self._dep_index.snapshot()
-                dims = set(self.get_dimensions()) if hasattr(self, 'tables') else set()
+                dims = self._cached_dimensions()[1] if hasattr(self, 'tables') else set()
                 queries = set(self.queries.keys()) if hasattr(self, 'queries') else set()
                 filtered = {}
                 for src, deps in snap.items():
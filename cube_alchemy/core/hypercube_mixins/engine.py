@@ -1,11 +1,22 @@
+import sys
+import numpy as np
 import pandas as pd
-from typing import List, Dict, Any, Optional, Tuple
-from collections import deque
+from typing import List, Dict, Any, Optional, Tuple, Iterable
+from collections import OrderedDict, defaultdict, deque
+from itertools import combinations
 
 from .graph_visualizer import GraphVisualizer
 from .filter import Filter
 from .query import Query
 
+# Column positions of requested fetches kept per table (see _table_column_positions)
+_COLUMN_POSITIONS_CACHE_SIZE = 256
+
+
+def _intern(column: Any) -> Any:
+    # Metric and query names are interned, so interned column keys make their lookups identity hits
+    return sys.intern(column) if type(column) is str else column
+
 class Engine(GraphVisualizer, Filter, Query):
     def __init__(self) -> None:
         # Initialize Query registries (metrics, derived_metrics, queries)
@@ -23,7 +34,7 @@ class Engine(GraphVisualizer, Filter, Query):
         """
 
         def _get_index_and_key_cols(df: pd.DataFrame) -> List[str]:
-            return [c for c in df.columns if c.startswith('_index_') or c.startswith('_key_')]
+            return [c for c in df.columns if c.startswith(('_index_', '_key_'))]
 
         if not trajectory:
             # No path but there's a single table, return its index column
@@ -76,12 +87,16 @@ class Engine(GraphVisualizer, Filter, Query):
         """
         table_join_map: Dict[str, str] = {}
         for table_name, table in self.tables.items():
-            idx_cols = [c for c in table.columns if c.startswith('_index_')]
-            key_cols = [c for c in table.columns if c.startswith('_key_')]
-            if idx_cols:
-                table_join_map[table_name] = idx_cols[0]
-            elif key_cols:
-                table_join_map[table_name] = key_cols[0]
+            # single pass: the first index column wins, else the first key column
+            join_col = None
+            for c in table.columns:
+                if c.startswith('_index_'):
+                    join_col = c
+                    break
+                if join_col is None and c.startswith('_key_'):
+                    join_col = c
+            if join_col is not None:
+                table_join_map[table_name] = join_col
             else:
                 self.log().warning(f"No index or key column found for table {table_name}.")
         
@@ -95,39 +110,60 @@ class Engine(GraphVisualizer, Filter, Query):
         table_names: List[str]
     ) -> None:
         """Create a link table for the shared column and update the original tables with keys."""
-        link_table = pd.DataFrame()
-        for table_name in table_names:
-            unique_values = self.tables[table_name][[column]].drop_duplicates()
-            link_table = pd.concat([link_table, unique_values], ignore_index=True).drop_duplicates()
-        # Assign link keys as nullable integers to safely handle joins that introduce NAs
-        link_table[f'_key_{column}'] = pd.Series(
-            range(1, len(link_table) + 1), dtype='Int64'
-        )
+        # One concat of each table's distinct values (first occurrence order, as an incremental union would give)
+        link_table = pd.concat(
+            [self.tables[table_name][[column]].drop_duplicates() for table_name in table_names],
+            ignore_index=True,
+            copy=False,
+        ).drop_duplicates(ignore_index=True)
+        # Assign link keys as nullable integers to safely handle joins that introduce NAs, in the narrowest
+        # signed width that holds 1..n (most dimensions fit 16 bits, which quarters the key memory in the core)
+        n = len(link_table)
+        key_dtype = 'Int16' if n < 2**15 else 'Int32' if n < 2**31 else 'Int64'
+        link_table[f'_key_{column}'] = pd.array(np.arange(1, n + 1, dtype=key_dtype.lower()), dtype=key_dtype)
         self.link_table_keys.append(f'_key_{column}')
         self.tables[link_table_name] = link_table
         self.link_tables[link_table_name] = link_table
+        # Keys are positional (1..n), so attaching them is a lookup of each value's position in the link table:
+        # one hash of the distinct values reused by every participating table instead of a merge per table
+        link_values = pd.Index(link_table[column])
         for table_name in table_names:
-            self.tables[table_name] = pd.merge(
-                self.tables[table_name],
-                link_table,
-                on=column,
-                how='left'
-            )
+            positions = link_values.get_indexer(self.tables[table_name][column])
+            # shallow copy: the new key column and the rename below must not leak into the caller's frame
+            table = self.tables[table_name].copy(deep=False)
+            # (left-join semantics: a value without a match would get a null key)
+            table[f'_key_{column}'] = pd.arrays.IntegerArray((positions + 1).astype(key_dtype.lower()), positions < 0)
+            self.tables[table_name] = table
             #rename or drop the column to differentiate it from the original column
             if self.rename_original_shared_columns:
                 self.tables[table_name].rename(columns={column: f'{column} <{table_name}>'}, inplace=True)
             else:
                 self.tables[table_name].drop(columns=[column], inplace=True)
 
-    def _add_auto_relationships(self) -> None:
-        table_names = list(self.tables.keys())
-        for i in range(len(table_names)):
-            for j in range(i + 1, len(table_names)):
-                table1 = table_names[i]
-                table2 = table_names[j]
-                common_columns = set(self.tables[table1].columns).intersection(set(self.tables[table2].columns))
-                for column in common_columns:
-                    self._add_relationship(table1, table2, column, column)
+    def _add_auto_relationships(self, tables: Optional[Iterable[str]] = None) -> None:
+        """Relate every pair of tables sharing a column name.
+
+        If `tables` is given, only pairs with at least one side in it are scanned (pair order is preserved).
+        """
+        only = set(tables) if tables is not None else None
+        # Invert to column -> tables so only columns that are actually shared produce pairs (no T^2 scan)
+        position = {name: i for i, name in enumerate(self.tables)}
+        column_tables: Dict[str, List[str]] = defaultdict(list)
+        for table_name, table in self.tables.items():
+            for column in table.columns.tolist():
+                column_tables[column].append(table_name)
+        pair_columns: Dict[Tuple[str, str], List[str]] = defaultdict(list)
+        for column, table_names in column_tables.items():
+            if len(table_names) < 2:
+                continue
+            for table1, table2 in combinations(table_names, 2):
+                if only is not None and table1 not in only and table2 not in only:
+                    continue
+                pair_columns[(table1, table2)].append(column)
+        # Relationships (and so path search) keep the table-pair order of the pairwise scan
+        for table1, table2 in sorted(pair_columns, key=lambda pair: (position[pair[0]], position[pair[1]])):
+            for column in pair_columns[(table1, table2)]:
+                self._add_relationship(table1, table2, column, column)
 
     def _add_table(
         self,
@@ -135,6 +171,9 @@ class Engine(GraphVisualizer, Filter, Query):
         table_data: pd.DataFrame
     ) -> None:
         self.tables[table_name] = table_data
+        # keep the mapping current without rebuilding it (the new table wins on name clashes)
+        self.column_to_table.update((_intern(column), table_name) for column in table_data.columns)
+        self._invalidate_dimensions_cache()
     # I chose to leave it as a pair as, even currently the model's schema is assuming implicit relationships by column names, it could be adapted to use explicit (and even uni-directional? - need to think more about this -) relationships in the future.
     def _add_relationship(
         self,
@@ -149,27 +188,29 @@ class Engine(GraphVisualizer, Filter, Query):
             else:
                 self.relationships[(table1_name, table2_name)] = (key1, key2)
                 self.relationships[(table2_name, table1_name)] = (key2, key1)
+                self._relationships_changed()
         elif (table1_name in self.link_tables or table2_name in self.link_tables):
             self.relationships[(table1_name, table2_name)] = (key1, key2)
             self.relationships[(table2_name, table1_name)] = (key2, key1)
+            self._relationships_changed()
         return None
 
     def _build_column_to_table_mapping(self) -> None:
-        for table_name, table in self.tables.items():
-            for column in table.columns:
-                self.column_to_table[column] = table_name
+        # later tables win on name clashes, same as assigning column by column
+        self.column_to_table = {
+            _intern(column): table_name for table_name, table in self.tables.items() for column in table.columns
+        }
 
     def _create_link_tables(self) -> None:
-        all_columns = {}
+        all_columns: Dict[str, List[str]] = defaultdict(list)
         for table_name, table_data in self.tables.items():
-            for column in table_data.columns:
-                if column not in all_columns:
-                    all_columns[column] = []
+            for column in table_data.columns.tolist():
                 all_columns[column].append(table_name)
-        for column, table_names in all_columns.items():
-            if len(table_names) > 1:
-                link_table_name = f'_link_table_{column}'
-                self._create_and_update_link_table(column, link_table_name, table_names)
+        # Collect first: building a link table rewrites the tables being scanned
+        shared = [(column, table_names) for column, table_names in all_columns.items() if len(table_names) > 1]
+        for column, table_names in shared:
+            link_table_name = f'_link_table_{column}'
+            self._create_and_update_link_table(column, link_table_name, table_names)
 
     def _find_complete_trajectory(
         self,
@@ -178,6 +219,15 @@ class Engine(GraphVisualizer, Filter, Query):
         if not target_tables:
             return []
         target_table_list = list(target_tables.keys())
+        central = self._central_link_table()
+        if central is not None and all(t in self._relationship_adjacency() for t in target_table_list):
+            # Single-link star: every hop between two tables goes through the link table, no search needed
+            final_trajectory = [target_table_list[0]]
+            for table in target_table_list[1:]:
+                if table != central and final_trajectory[-1] != central:
+                    final_trajectory.append(central)
+                final_trajectory.append(table)
+            return final_trajectory
         start_table = target_table_list[0]
         trajectory = [start_table]
         for i in range(1, len(target_table_list)):
@@ -204,61 +254,145 @@ class Engine(GraphVisualizer, Filter, Query):
         return final_trajectory
 
     def _has_cyclic_relationships(self) -> Tuple[bool, List[Any]]:
-        def dfs(node: str, visited: set, path: List[str], parent: Optional[str]) -> List[str]:
-            visited.add(node)
-            path.append(node)
-            
-            # Get all connected tables (excluding the parent we came from)
-            connected_tables = set(table2 for (table1, table2) in self.relationships.keys() 
-                                if table1 == node and table2 != parent)
-            
-            for next_node in connected_tables:
-                if next_node not in visited:
-                    cycle = dfs(next_node, visited, path, node)
-                    if cycle:
-                        return cycle
-                # If we find a visited node that's in our path and isn't our immediate parent
-                elif next_node in path and next_node != parent:
-                    # Found a cycle
-                    cycle_start = path.index(next_node)
-                    return path[cycle_start:]
-            
-            path.pop()
-            return []
-
+        # Iterative DFS over the shared adjacency (no recursion limit on deep schemas). Relationships are stored
+        # in both directions, so the edge back to the parent is skipped; any other edge reaching a table on the
+        # current path closes a cycle.
+        adjacency = self._relationship_adjacency()
         visited = set()
-        
-        # Get unique table names (nodes)
-        tables = set(table for pair in self.relationships.keys() for table in pair)
-        
+
         # Check from each unvisited node
-        for table in tables:
-            if table not in visited:
-                cycle = dfs(table, visited, [], None)
-                if cycle:
-                    return True, cycle
+        for root in adjacency:
+            if root in visited:
+                continue
+            visited.add(root)
+            path: List[str] = [root]
+            position = {root: 0}  # tables on the current path -> index in path
+            parents: List[Optional[str]] = [None]
+            stack = [iter(adjacency[root])]
+            while stack:
+                edge = next(stack[-1], None)
+                if edge is None:
+                    stack.pop()
+                    del position[path.pop()]
+                    parents.pop()
+                    continue
+                next_node = edge[0]
+                if next_node == parents[-1]:
+                    continue
+                if next_node not in visited:
+                    visited.add(next_node)
+                    parents.append(path[-1])
+                    position[next_node] = len(path)
+                    path.append(next_node)
+                    stack.append(iter(adjacency.get(next_node, ())))
+                elif next_node in position:
+                    # Found a cycle
+                    return True, path[position[next_node]:]
 
         return False, []   
 
     def _get_trajectory(self,tables_to_find):
         return self._find_complete_trajectory(tables_to_find)
     
+    def _relationships_changed(self) -> None:
+        """Mark cached relationship paths stale. Must be called whenever self.relationships changes."""
+        self._relationships_version = getattr(self, '_relationships_version', 0) + 1
+
     def _find_path(
         self,
         start_table: str,
         end_table: str
     ) -> Optional[List[Any]]:
-        queue = deque([(start_table, [])])
-        visited = {start_table}
-        while queue:
-            current_table, path = queue.popleft()
-            if current_table == end_table:
-                return path
-            for (neighbor_table, (key1, key2)) in self.relationships.items():
-                if neighbor_table[0] == current_table and neighbor_table[1] not in visited:
-                    visited.add(neighbor_table[1])
-                    queue.append((neighbor_table[1], path + [(neighbor_table[0], neighbor_table[1], key1, key2)]))
-        return None
+        # Trajectories ask for the same pairs over and over (the fallback probes every table), memoize per graph version
+        version = getattr(self, '_relationships_version', 0)
+        if getattr(self, '_path_cache_version', None) != version:
+            self._path_cache: Dict[Tuple[str, str], Optional[Tuple[Any, ...]]] = {}
+            self._path_cache_version = version
+        key = (start_table, end_table)
+        if key in self._path_cache:
+            cached = self._path_cache[key]
+            return None if cached is None else list(cached)
+        path = self._find_path_uncached(start_table, end_table)
+        self._path_cache[key] = None if path is None else tuple(path)
+        return path
+
+    def _find_path_uncached(
+        self,
+        start_table: str,
+        end_table: str
+    ) -> Optional[List[Any]]:
+        # Bidirectional BFS: grow the smaller frontier a level at a time until the two searches meet.
+        # Each side maps a reached table to the edge it was reached by (None at its root).
+        if start_table == end_table:
+            return []
+        adjacency = self._relationship_adjacency()
+        forward: Dict[str, Optional[Tuple[str, str, str]]] = {start_table: None}
+        backward: Dict[str, Optional[Tuple[str, str, str]]] = {end_table: None}
+        forward_queue, backward_queue = deque([start_table]), deque([end_table])
+
+        def expand(queue, reached, other, is_forward):
+            for _ in range(len(queue)):
+                table = queue.popleft()
+                for neighbor, key1, key2 in adjacency.get(table, ()):
+                    if neighbor in reached:
+                        continue
+                    # store the edge oriented towards this side's root
+                    reached[neighbor] = (table, key1, key2) if is_forward else (table, key2, key1)
+                    if neighbor in other:
+                        return neighbor
+                    queue.append(neighbor)
+            return None
+
+        meeting = None
+        while forward_queue and backward_queue and meeting is None:
+            if len(forward_queue) <= len(backward_queue):
+                meeting = expand(forward_queue, forward, backward, True)
+            else:
+                meeting = expand(backward_queue, backward, forward, False)
+        if meeting is None:
+            return None
+
+        path = []
+        table = meeting
+        while forward[table] is not None:
+            previous, key1, key2 = forward[table]
+            path.append((previous, table, key1, key2))
+            table = previous
+        path.reverse()
+        table = meeting
+        while backward[table] is not None:
+            following, key1, key2 = backward[table]
+            path.append((table, following, key1, key2))
+            table = following
+        return path
+
+    def _relationship_adjacency(self) -> Dict[str, List[Tuple[str, str, str]]]:
+        """table -> [(neighbor, key1, key2), ...] in relationship insertion order, rebuilt per graph version."""
+        version = getattr(self, '_relationships_version', 0)
+        if getattr(self, '_adjacency_version', None) != version:
+            adjacency: Dict[str, List[Tuple[str, str, str]]] = {}
+            for (table1, table2), (key1, key2) in self.relationships.items():
+                adjacency.setdefault(table1, []).append((table2, key1, key2))
+            self._adjacency = adjacency
+            self._adjacency_version = version
+        return self._adjacency
+
+    def _central_link_table(self) -> Optional[str]:
+        """The link table every other table hangs off (and only off), if the graph is a single-link star."""
+        version = getattr(self, '_relationships_version', 0)
+        if getattr(self, '_central_link_version', None) != version:
+            central = None
+            adjacency = self._relationship_adjacency()
+            for link_table in self.link_tables:
+                if link_table in adjacency and all(
+                    table == link_table or [n for n, _, _ in neighbors] == [link_table]
+                    for table, neighbors in adjacency.items()
+                ):
+                    central = link_table
+                    break
+            self._central_link = central
+            self._central_link_version = version
+        return self._central_link
 
     def get_relationship_matrix(self, context_state_name: str = 'Unfiltered', core = False) -> pd.DataFrame:
         if core:
@@ -295,29 +429,32 @@ class Engine(GraphVisualizer, Filter, Query):
         results: List[Dict[str, Any]] = []
         for key in shared_keys:
             tables_sharing_key = [t for t in base_tables if key in self.tables[t].columns]
+            if len(tables_sharing_key) < 2:
+                continue
+            shared_column = key[len("_key_"):]  # The original shared column name
+            # Per-table values and counts only depend on (table, key): fetch and count each table once, not once per pair
+            values_and_counts: Dict[str, Tuple[pd.Series, pd.Series]] = {}
+            for t in tables_sharing_key:
+                values = self.dimensions(dimensions=[f'_index_{t}', shared_column]).dropna()[shared_column]
+                values_and_counts[t] = (values, values.value_counts())
             for i in range(len(tables_sharing_key)):
                 for j in range(i + 1, len(tables_sharing_key)):
                     t1, t2 = tables_sharing_key[i], tables_sharing_key[j]
-                    shared_column = key[len("_key_"):]  # The original shared column name
                     self.log().info(f"Computing cardinality between {t1} and {t2} on shared column {shared_column}")
 
                     #If I want to use the context state, I need to get the relevant values first.. I can use the indexes of the tables
                     #print(self.context_states[context_state_name][[f'_index_{t1}',key]])
-                    s1 = self.dimensions(dimensions=[f'_index_{t1}',shared_column]).dropna()[shared_column]
-                    s2 = self.dimensions(dimensions=[f'_index_{t2}',shared_column]).dropna()[shared_column]
-                    #I need to first filter the tables by the context state indexes and then get the relevant key columns. idx1 and idx2 are pandas series with the relevant indexes
-
-
-                    c1 = s1.value_counts()
-                    c2 = s2.value_counts()
+                    s1, c1 = values_and_counts[t1]
+                    s2, c2 = values_and_counts[t2]
                     inter = c1.index.intersection(c2.index)
 
                     if len(inter) == 0:
                         cardinality = "no relationship"
                         max1 = max2 = 0
                     else:
-                        max1 = int(c1.loc[inter].max())
-                        max2 = int(c2.loc[inter].max())
+                        # inter is drawn from both count indexes, so reindex gives the same rows without .loc label checks
+                        max1 = int(c1.reindex(inter).to_numpy().max())
+                        max2 = int(c2.reindex(inter).to_numpy().max())
                         if s1.empty or s2.empty:
                             cardinality = "no relationship"
                         elif max1 == 1 and max2 == 1:
@@ -382,14 +519,15 @@ class Engine(GraphVisualizer, Filter, Query):
         - Joins on that table's index if present, otherwise on its link key(s).
         """
         # Group columns by table (we can join once per table)
-        by_table: Dict[str, List[str]] = {}
+        by_table: Dict[str, List[str]] = defaultdict(list)
+        column_to_table = self.column_to_table  # local alias, looked up once per requested column
         for col in columns_to_fetch:
-            t = self.column_to_table.get(col)
+            t = column_to_table.get(col)
             if not t:
                 self.log().warning("Warning: Column %s not found in any table.", col)
                 continue
-            if not col.startswith('_index_') and not col.startswith('_key_'):
-                by_table.setdefault(t, []).append(col)
+            if not col.startswith(('_index_', '_key_')):
+                by_table[t].append(col)
 
         out = keys_and_indexes_df
         for table_name, cols in by_table.items():
@@ -400,13 +538,76 @@ class Engine(GraphVisualizer, Filter, Query):
                 continue
 
             if cols:
+                # Index and key columns are unique per table, so a left merge is a positional take.
+                # Look the keys up in the table's cached join index instead of re-hashing them per merge.
+                join_index, is_positional = self._table_join_index(table_name, table_df, join_column)
+                if join_index.is_unique and out.columns.intersection(cols).empty:
+                    keys = out[join_column]
+                    positions = None
+                    if is_positional and not keys.hasnans:
+                        # _index_ columns are the row numbers 0..n-1, so the keys are the positions (no hash lookup)
+                        positions = keys.to_numpy(dtype=np.int64)
+                        if len(positions) and (positions.min() < 0 or positions.max() >= len(table_df)):
+                            positions = None
+                    if positions is None:
+                        positions = join_index.get_indexer(keys)
+                    if (positions >= 0).all():
+                        if not (isinstance(out.index, pd.RangeIndex) and out.index.start == 0 and out.index.step == 1):
+                            out = out.reset_index(drop=True)  # merge returns a fresh 0..n-1 index
+                        fetched = table_df.iloc[positions, self._table_column_positions(table_name, table_df, cols)]
+                        fetched.index = out.index
+                        out = pd.concat([out, fetched], axis=1)
+                        continue
+                # Missing keys, duplicates or name clashes: keep merge's null handling and suffixing
                 # Select join columns plus requested columns (requested columns don't include join cols)
                 select_cols = [join_column] + cols
                 right = table_df[select_cols]
                 out = pd.merge(out, right, on=join_column, how='left')
 
         return out
+
+    def _table_join_index(self, table_name: str, table_df: pd.DataFrame, join_column: str) -> Tuple[pd.Index, bool]:
+        """The table's join column as an Index, and whether its values are exactly the row positions 0..n-1."""
+        # Cached per table object, so a replaced table (e.g. emptied by the normalized core) is re-indexed
+        cache = getattr(self, '_join_index_cache', None)
+        if cache is None:
+            cache = self._join_index_cache = {}
+        entry = cache.get(table_name)
+        if entry is None or entry[0] is not table_df or entry[1] != join_column:
+            join_index = pd.Index(table_df[join_column])
+            is_positional = (
+                pd.api.types.is_integer_dtype(join_index.dtype)
+                and not join_index.hasnans
+                and np.array_equal(join_index.to_numpy(dtype=np.int64), np.arange(len(join_index)))
+            )
+            entry = (table_df, join_column, join_index, is_positional)
+            cache[table_name] = entry
+        return entry[2], entry[3]
     
+    def _table_column_positions(self, table_name: str, table_df: pd.DataFrame, cols: List[str]) -> np.ndarray:
+        """Positions of cols in table_df, kept across queries (LRU) so the gather takes straight from the table.
+
+        Only positions are cached, never column copies; an entry is valid while the table's columns are unchanged.
+        """
+        cache = getattr(self, '_column_positions_cache', None)
+        if cache is None:
+            cache = self._column_positions_cache = OrderedDict()
+        key = (table_name, tuple(cols))
+        entry = cache.get(key)
+        if entry is not None and entry[0] is table_df.columns:
+            cache.move_to_end(key)
+            return entry[1]
+        positions = table_df.columns.get_indexer_for(cols)
+        cache[key] = (table_df.columns, positions)
+        if len(cache) > _COLUMN_POSITIONS_CACHE_SIZE:
+            cache.popitem(last=False)
+        return positions
+
+    def _clear_fetch_caches(self) -> None:
+        """Drop per-table fetch caches (join indexes, column positions); call when the tables are replaced."""
+        self._join_index_cache = {}
+        self._column_positions_cache = OrderedDict()
+
     def _fetch_and_filter_not_fully_deployed_core_strategy(
         self,
         dimensions: Optional[List[str]] = None,
@@ -18,6 +18,7 @@ class Filter:
             raise ValueError("Cannot use 'Unfiltered' state name to change filter state. Please use a different state name.")
 
         self.context_states[context_state_name] = self._fetch_and_filter(context_state_name=context_state_name, filter_criteria=criteria)
+        self._state_changed()
 
         if not is_reset:
             self._truncate_filter_history(context_state_name=context_state_name)
@@ -106,6 +107,7 @@ class Filter:
             self.applied_filters[context_state_name].append({"op": 'remove', "dimensions": dimensions})
 
             self.context_states[context_state_name] = self.context_states['Unfiltered'].copy()
+            self._state_changed()
         else:
             raise ValueError("Invalid direction. Use 'backward', 'forward', or 'all'.")
 
@@ -177,6 +179,7 @@ class Filter:
             self.context_states[context_state_name] = self.context_states[base_context_state_name].copy()
             self.applied_filters[context_state_name]  =  [] 
             self.filter_pointer[context_state_name]  = 0 
+            self._state_changed()
             return True
         except Exception as e:
             self.log().error("Error setting state '%s': %s", context_state_name, e)
@@ -1,5 +1,3 @@
-import networkx as nx
-import matplotlib.pyplot as plt
 import re
 from typing import Optional
 
@@ -13,8 +11,10 @@ class GraphVisualizer:
         show: bool = True,            # control plt.show()
         return_fig: bool = False      # return the Matplotlib Figure for programmatic use
     ):
-        
-        
+        # imported here so loading a hypercube doesn't pull in networkx
+        import networkx as nx
+        import matplotlib.pyplot as plt
+
         graph = nx.DiGraph()
         node_labels = {}
 
@@ -1,7 +1,8 @@
 from __future__ import annotations
+import copy
 import logging
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Optional, Tuple
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
 
 from cube_alchemy.catalogs import Catalog, Source, YAMLSource, ModelYAMLSource, Repository, InMemoryRepository
 
@@ -21,6 +22,8 @@ class ModelCatalog:
         self.model_catalog: Optional[Catalog] = None
         # YAML file path bound to this cube for model catalog
         self._model_yaml_path: Optional[Path] = None
+        # (kind, name) -> (spec as last applied, object it produced in the cube); lets reloads skip unchanged items
+        self._applied_catalog_specs: Dict[Tuple[str, str], Tuple[Dict[str, Any], Any, Tuple[int, int]]] = {}
 
     # ---------- YAMLsource wiring ----------
     def set_yaml_model_catalog(self, path: Optional[str] = None, use_current_directory: bool = True, create_if_missing: bool = True, 
@@ -142,31 +145,72 @@ class ModelCatalog:
         def _do(k: str) -> bool:
             return (kinds_set is None) or (k in kinds_set)
 
-        if _do("metrics"):
-            for name in catalog.list("metrics"):
-                spec = catalog.get("metrics", name) or {}
-                self._apply_metric_to_hypercube(name, spec)
-
-        if _do("derived_metrics"):
-            for name in catalog.list("derived_metrics"):
-                spec = catalog.get("derived_metrics", name) or {}
-                self._apply_derived_metric_to_hypercube(name, spec)
-
-        if _do("queries"):
-            for name in catalog.list("queries"):
-                spec = catalog.get("queries", name) or {}
-                self._apply_query_to_hypercube(name, spec)
+        # Dependent queries are refreshed once after all metrics/queries are applied, not per definition
+        started = self._defer_query_refresh()
+        try:
+            if _do("metrics"):
+                for name in catalog.list("metrics"):
+                    spec = catalog.get("metrics", name) or {}
+                    self._apply_if_changed_("metrics", name, spec, self._apply_metric_to_hypercube)
+
+            if _do("derived_metrics"):
+                for name in catalog.list("derived_metrics"):
+                    spec = catalog.get("derived_metrics", name) or {}
+                    self._apply_if_changed_("derived_metrics", name, spec, self._apply_derived_metric_to_hypercube)
+
+            if _do("queries"):
+                for name in catalog.list("queries"):
+                    spec = catalog.get("queries", name) or {}
+                    self._apply_if_changed_("queries", name, spec, self._apply_query_to_hypercube)
+        finally:
+            if started:
+                self._flush_query_refresh()
 
         if _do("plots"):
             for name in catalog.list("plots"):
                 spec = catalog.get("plots", name) or {}
-                self._apply_plot_to_hypercube(name, spec)
+                self._apply_if_changed_("plots", name, spec, self._apply_plot_to_hypercube)
 
         if _do("transformers"):
             for name in catalog.list("transformers"):
                 spec = catalog.get("transformers", name) or {}
                 self._apply_transformer_to_hypercube(name, spec)
 
+    def _catalog_item_in_cube_(self, kind: str, name: str, spec: Dict[str, Any]) -> Any:
+        """Return the cube object currently registered for a catalog item (None if absent)."""
+        if kind == "metrics":
+            return self.metrics.get(name)
+        if kind == "derived_metrics":
+            return self.derived_metrics.get(name)
+        if kind == "queries":
+            return self.queries.get(name)
+        if kind == "plots":
+            qstate = self.plotting_components.get(spec.get("query")) or {}
+            return qstate.get('plots', {}).get(name)
+        return None
+
+    def _apply_if_changed_(self, kind: str, name: str, spec: Dict[str, Any], apply: Callable[[str, Dict[str, Any]], None]) -> None:
+        """Apply a catalog item unless the cube still holds what this same spec produced on a previous load.
+
+        Reloading an unchanged model would otherwise redefine everything and cascade query refreshes.
+        The registered object must be the very one we created, so edits made on the cube in between are overwritten,
+        and the schema must be the one it was planned against (load_data bumps both versions).
+        """
+        applied_specs = getattr(self, '_applied_catalog_specs', None)
+        if applied_specs is None:
+            applied_specs = self._applied_catalog_specs = {}
+        key = (kind, name)
+        applied = applied_specs.get(key)
+        current = self._catalog_item_in_cube_(kind, name, spec)
+        schema = (getattr(self, '_tables_version', 0), getattr(self, '_relationships_version', 0))
+        if (
+            applied is not None and current is not None and applied[1] is current
+            and applied[2:] == (schema,) and applied[0] == spec
+        ):
+            return
+        apply(name, spec)
+        applied_specs[key] = (copy.deepcopy(spec), self._catalog_item_in_cube_(kind, name, spec), schema)
+
     def _apply_metric_to_hypercube(self, name: str, spec: Dict[str, Any]) -> None:
         self.define_metric(
             name=name,
@@ -226,7 +270,7 @@ class ModelCatalog:
         figsize_val = spec.get("figsize")
         figsize = tuple(figsize_val) if isinstance(figsize_val, (list, tuple)) else figsize_val
         # Decide default: if not specified in spec, make the first plot per query the default
-        qstate = getattr(self, 'plotting_components', {}).get(query_name) if hasattr(self, 'plotting_components') else None
+        qstate = self.plotting_components.get(query_name)
         default_exists = bool(qstate and qstate.get('default')) if isinstance(qstate, dict) else False
         set_default = spec.get("set_as_default") if "set_as_default" in spec else (not default_exists)
 
@@ -315,22 +359,27 @@ class ModelCatalog:
                 qspec = queries.get(name, {})
             # Normalize sort to list[{'column','direction'}] for readability
             sort = qspec.get("sort") or []
-            norm_sort: List[Dict[str, str]] = []
-            if isinstance(sort, list):
-                for item in sort:
-                    if isinstance(item, (list, tuple)) and len(item) >= 1:
-                        norm_sort.append({"column": item[0], "direction": (item[1] if len(item) > 1 else "asc")})
-                    elif isinstance(item, dict) and "column" in item:
-                        norm_sort.append({"column": item["column"], "direction": item.get("direction", "asc")})
-                    elif isinstance(item, str):
-                        parts = item.split()
-                        norm_sort.append({"column": parts[0], "direction": (parts[1] if len(parts) > 1 else "asc")})
+            norm_sort: List[Dict[str, str]]
+            if isinstance(sort, list) and all(type(item) is tuple and len(item) == 2 for item in sort):
+                # the shape define_query receives from the catalog and from most callers
+                norm_sort = [{"column": col, "direction": direction} for col, direction in sort]
+            else:
+                norm_sort = []
+                if isinstance(sort, list):
+                    for item in sort:
+                        if isinstance(item, (list, tuple)) and len(item) >= 1:
+                            norm_sort.append({"column": item[0], "direction": (item[1] if len(item) > 1 else "asc")})
+                        elif isinstance(item, dict) and "column" in item:
+                            norm_sort.append({"column": item["column"], "direction": item.get("direction", "asc")})
+                        elif isinstance(item, str):
+                            parts = item.split()
+                            norm_sort.append({"column": parts[0], "direction": (parts[1] if len(parts) > 1 else "asc")})
             qcopy = dict(qspec)
             qcopy["sort"] = norm_sort
             data["queries"][name] = qcopy
 
         # Plots: stored per-query inside plotting_components; flatten
-        plotting_state = getattr(self, "plotting_components", {})
+        plotting_state = self.plotting_components
         if isinstance(plotting_state, dict):
             for query_name, qstate in plotting_state.items():
                 plots = (qstate or {}).get("plots", {})
@@ -5,6 +5,13 @@ import copy
 
 import time
 
+def _copy_plot_config(config: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Copy a stored plot config for one render: containers are deep-copied, scalars (most keys) are shared."""
+    if config is None:
+        return None
+    return {k: copy.deepcopy(v) if isinstance(v, (dict, list, set)) else v for k, v in config.items()}
+
+
 class Plotting:
     """Component for managing plot configurations for queries."""
     def __init__(self):
@@ -253,7 +260,7 @@ class Plotting:
 
             # Get or reuse the DataFrame once
             if _persisted_shared_df is None:
-                _, shared_df = self.query(query_name=query_name, options=None, _retrieve_query_name=True)
+                shared_df = self._cached_query(query_name)
             else:
                 shared_df = _persisted_shared_df
 
@@ -272,15 +279,16 @@ class Plotting:
             return shared_df, configs
         
         # Single plot: get or reuse DataFrame
-        if _persisted_shared_df is None:
+        if _persisted_shared_df is None and query_options is None:
+            plot_df = self._cached_query(query_name)
+        elif _persisted_shared_df is None:
             query_name, plot_df = self.query(query_name=query_name, options=query_options, _retrieve_query_name=True)
         else:
             plot_df = _persisted_shared_df
 
-        # Get plot configuration (or create a default one if not exists). We get a deep copy as it might need to change for this specific plot.
+        # Get plot configuration (or create a default one if not exists). We get a copy as it might need to change for this specific plot.
         try:
-            config = self.get_plot_config(query_name, plot_name)
-            config = copy.deepcopy(config) #deep copy to avoid modifying the stored default config
+            config = _copy_plot_config(self.get_plot_config(query_name, plot_name))
             # Override plot type if passed
             if plot_type is not None:
                 config['plot_type'] = plot_type
@@ -305,8 +313,7 @@ class Plotting:
             )
             self.log().info("Auto-generated %s plot config: %s for query %s", chosen_plot_type, auto_plot_name, query_name)
             # Now get the newly defined plot config
-            config = self.get_plot_config(query_name, plot_name=auto_plot_name)
-            config = copy.deepcopy(config) 
+            config = _copy_plot_config(self.get_plot_config(query_name, plot_name=auto_plot_name))
 
         for k, v in kwargs.items():
             if k in config:
@@ -4,6 +4,9 @@ from ..metric import Metric, MetricGroup, DerivedMetric
 from typing import Dict, List, Any, Optional
 import copy
 import uuid
+from collections import OrderedDict
+from functools import lru_cache
+from itertools import chain
 from ..function_registry import FunctionRegistry
 
 from .plotting import Plotting
@@ -21,6 +24,24 @@ def brackets_to_backticks(expression: str) -> str:
     """
     return re.sub(r'\[(.*?)\]', lambda m: f"`{m.group(1)}`", expression)
 
+@lru_cache(maxsize=1024)
+def _compile_derived_expression(expression: str) -> Any:
+    """Translate a derived metric expression to Python and compile it once per expression string."""
+    # Turn [col] into df['col'] for Python eval
+    expr = add_quotes_to_brackets(expression.replace('[', 'df['))
+    # Allow using @fn for registered functions
+    expr = re.sub(r'@([A-Za-z_]\w*)', r'\1', expr)
+    return compile(expr, '<derived metric>', 'eval')
+
+@lru_cache(maxsize=1024)
+def _having_to_query(having: str) -> str:
+    # Convert [col] -> `col` for DataFrame.query backtick syntax (cached: the same HAVING runs on every query call)
+    return brackets_to_backticks(having)
+
+# Query results kept for repeated plotting of the same query: at most this many queries and bytes
+_QUERY_RESULT_CACHE_SIZE = 64
+_QUERY_RESULT_CACHE_BYTES = 64 * 2**20
+
 class Query(Transformation, Plotting):
     def __init__(self):
         # Central registries for analytics components
@@ -41,6 +62,8 @@ class Query(Transformation, Plotting):
         self.metrics.clear()
         self.derived_metrics.clear()
         self.queries.clear()
+        for kind in ('metrics', 'derived_metrics', 'queries'):
+            self._bump_spec_version(kind)
         self.plotting_components.clear()
         self.transformation_components.clear()
         self.function_registry = FunctionRegistry.from_defaults()
@@ -51,7 +74,11 @@ class Query(Transformation, Plotting):
     # Centralize function registry behavior in Query
     @property
     def function_registry(self) -> Any:
-        return getattr(self, "_function_registry", FunctionRegistry.from_defaults())
+        registry = getattr(self, "_function_registry", None)
+        if registry is None:
+            # Build the default lazily instead of on every access
+            registry = FunctionRegistry.from_defaults()
+        return registry
 
     @function_registry.setter
     def function_registry(self, value: Any) -> None:
@@ -66,6 +93,7 @@ class Query(Transformation, Plotting):
                 self._function_registry = FunctionRegistry(dict(value))  # type: ignore[arg-type]
             except Exception:
                 raise TypeError("function_registry must be a dict or FunctionRegistry")
+        self._state_changed()
 
 
     def dimension(self, dimension:str,
@@ -80,6 +108,60 @@ class Query(Transformation, Plotting):
     def add_functions(self, **kwargs):
         """Add variables/functions to the registry for expressions and DataFrame.query via @name."""
         self.function_registry.update(kwargs)
+        self._state_changed()
+
+    def _state_changed(self) -> None:
+        """Drop cached query results; call whenever filters, tables, functions or transformations change.
+
+        Code that assigns to self.context_states directly (outside filter/set_context_state) must call this too.
+        """
+        self._state_version = getattr(self, '_state_version', 0) + 1
+        cache = getattr(self, '_query_result_cache', None)
+        if cache:
+            cache.clear()
+            self._query_result_cache_bytes = 0
+
+    def _cached_query(self, query_name: str) -> pd.DataFrame:
+        """Result of a defined query, reused until its specs or the hypercube state change.
+
+        One entry is kept per query, valid while the query and the metrics/derived metrics it uses keep their
+        versions, so defining other queries (including ad-hoc ones) does not drop it. The cache is bounded by
+        _QUERY_RESULT_CACHE_SIZE entries and _QUERY_RESULT_CACHE_BYTES (least recently used go first); larger
+        results are not cached.
+
+        Every hit still pays a full copy of the result, so this only pays off when running the query costs much
+        more than copying its (aggregated) output, which is the usual case for repeated plotting.
+        """
+        query = self.queries.get(query_name)
+        if not query:
+            return self.query(query_name=query_name)
+        cache = getattr(self, '_query_result_cache', None)
+        if cache is None:
+            cache = self._query_result_cache = OrderedDict()
+            self._query_result_cache_bytes = 0
+        signature = (
+            self._spec_item_version('queries', query_name),
+            tuple(self._spec_item_version('metrics', n) for n in chain(query['metrics'], query['hidden_metrics'])),
+            tuple(self._spec_item_version('derived_metrics', n) for n in query['derived_metrics_ordered']),
+            getattr(self.function_registry, 'version', 0),  # item assignment on the registry, not only add_functions
+        )
+        entry = cache.get(query_name)
+        if entry is not None and entry[0] == signature:
+            cache.move_to_end(query_name)
+            result = entry[1]
+        else:
+            if entry is not None:
+                del cache[query_name]
+                self._query_result_cache_bytes -= entry[2]
+            result = self.query(query_name=query_name)
+            nbytes = int(result.memory_usage(index=True, deep=True).sum())
+            if nbytes <= _QUERY_RESULT_CACHE_BYTES:
+                cache[query_name] = (signature, result, nbytes)
+                self._query_result_cache_bytes += nbytes
+                while len(cache) > _QUERY_RESULT_CACHE_SIZE or self._query_result_cache_bytes > _QUERY_RESULT_CACHE_BYTES:
+                    self._query_result_cache_bytes -= cache.popitem(last=False)[1][2]
+        # Callers get their own copy so the cached frame stays pristine
+        return result.copy()
 
     def query(
         self, 
@@ -132,7 +214,7 @@ class Query(Transformation, Plotting):
             self.log().info("New query defined: %s", new_query_name)
 
         # Build full set of metrics to compute using precomputed hidden metrics
-        all_metrics = query["metrics"] + query["hidden_metrics"]
+        all_metrics = [*query["metrics"], *query["hidden_metrics"]]
         metric_objects: List[Metric] = []
         for name in all_metrics:
             try:
@@ -222,7 +304,8 @@ class Query(Transformation, Plotting):
                     raise ValueError(f"Invalid value for ignore_dimensions: {metric.ignore_dimensions}")
 
                 # Fetch only what this metric needs: effective dims + metric-relevant columns (metric columns + indexes + nested dimensions)
-                all_relevant_columns = list(set(metric_effective_dims + metric.query_relevant_columns))
+                # (ordered dedupe: query_relevant_columns is already unique, so only the dims can overlap it)
+                all_relevant_columns = list(dict.fromkeys(chain(metric_effective_dims, metric.query_relevant_columns)))
                 metric_result = self._fetch_and_filter(dimensions = all_relevant_columns, context_state_name = context_state_name, filter_criteria = query_filters)[all_relevant_columns].drop_duplicates()
                 if no_dimension:  # fake dimension to group by, will be deleted later
                     metric_result[fake_dim_to_group_by] = True
@@ -481,14 +564,11 @@ class Query(Transformation, Plotting):
                     df.loc[filled_masks[col], col] = fillna_value
 
             try:
-                # Turn [col] into df['col'] for Python eval
-                expr = add_quotes_to_brackets(expression.replace('[', 'df['))
-                # Allow using @fn for registered functions
-                expr = re.sub(r'@([A-Za-z_]\w*)', r'\1', expr)
+                code = _compile_derived_expression(expression)
 
                 eval_locals = {"df": df}
                 eval_globals = self.function_registry
-                df[name] = eval(expr, eval_globals, eval_locals)
+                df[name] = eval(code, eval_globals, eval_locals)
 
             except Exception as e:
                 raise ValueError(f"Error evaluating derived metric '{name}': {e}") from e
@@ -508,8 +588,7 @@ class Query(Transformation, Plotting):
         # Apply HAVING-like filter
         if having:
             try:
-                # Convert [col] -> `col` for DataFrame.query backtick syntax
-                having_expr = brackets_to_backticks(having)
+                having_expr = _having_to_query(having)
                 df = df.query(having_expr, engine='python', local_dict=self.function_registry)
             except Exception as e:
                 raise ValueError(f"Error applying HAVING expression '{having}': {e}") from e
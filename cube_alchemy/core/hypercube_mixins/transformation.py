@@ -35,6 +35,7 @@ class Transformation:
         if not name or not isinstance(name, str):
             raise ValueError("Transformer name must be a non-empty string")
         self.transformers[name] = transformer
+        self._state_changed()
 
     # Definition management (single-step per transformer; transformer is the key)
     def define_transformation(
@@ -57,6 +58,7 @@ class Transformation:
 
         qstate = self.transformation_components.setdefault(query_name, {})
         qstate[transformer] = dict(params or {})
+        self._state_changed()
 
         # dependency index registration (use transformer as the identifier)
         try:
@@ -89,6 +91,7 @@ class Transformation:
         if not qstate or transformer not in qstate:
             return
         del qstate[transformer]
+        self._state_changed()
     
     def transform(
         self,
@@ -1,15 +1,38 @@
 import re
-from typing import Optional, List, Callable, Union, Any, Dict
+import sys
+from functools import lru_cache
+from typing import Optional, List, Callable, Union, Any, Dict, Tuple
 import copy
 from .spec_validators import normalize_nested
 
+_BRACKETED_COLUMN_RE = re.compile(r'\[(.*?)\]')
+
+@lru_cache(maxsize=1024)
+def _extract_columns_cached(text: str) -> Tuple[str, ...]:
+        # Expressions are re-parsed on every query (re)definition, so memoize per expression string.
+        # Names are interned: they are looked up in the metric/dimension registries over and over.
+        return tuple(dict.fromkeys(map(sys.intern, _BRACKETED_COLUMN_RE.findall(text))))
+
 def extract_columns(text: str = None) -> List[str]:
-        # Extract the columns by looking for text between square brackets
+        # Extract the columns by looking for text between square brackets (unique, in order of appearance)
         if text:
-            return list(set(re.findall(r'\[(.*?)\]', text)))
+            return list(_extract_columns_cached(text))
         return []
 
+def _restore_slots(obj: Any, state: Any) -> None:
+        # Accept both slot state ((None, {...}) from pickle protocol 2+) and plain __dict__ state from older pickles
+        if isinstance(state, tuple):
+            state = {k: v for part in state if part for k, v in part.items()}
+        for key, value in (state or {}).items():
+            setattr(obj, key, value)
+
 class Metric:
+    __slots__ = (
+        'name', 'expression', 'row_condition_expression', 'aggregation', 'columns', 'metric_filters',
+        'context_state_name', 'ignore_dimensions', 'ignore_context_filters', 'fillna', 'nested',
+        'nested_dimensions', 'columns_indexes', 'query_relevant_columns',
+    )
+
     def __init__(
         self,
         name: Optional[str] = None,
@@ -23,7 +46,7 @@ class Metric:
         fillna: Optional[any] = None,
         nested: Optional[Dict[str, Any]] = None,
     ) -> None:
-        self.name = name
+        self.name = sys.intern(name) if type(name) is str else name
         self.expression = expression
         self.row_condition_expression = row_condition_expression
         self.aggregation = aggregation
@@ -50,6 +73,9 @@ class Metric:
         self.columns_indexes = []
         self.query_relevant_columns = []  # (expression columns + nested dimensions + columns indexes)
 
+    def __setstate__(self, state: Any) -> None:
+        _restore_slots(self, state)
+
     def get_metric_details(self):
         import inspect
         #return a dictionary with metric details
@@ -96,16 +122,24 @@ class DerivedMetric:
     These are evaluated after base metrics are aggregated. They can reference
     any column present in the aggregated result using [Column] syntax.
     """
+    __slots__ = ('name', 'expression', 'fillna', 'columns', '_derived_deps', '_derived_deps_version')
+
     def __init__(
         self,
         name: str,
         expression: str,
         fillna: Optional[Any] = None,
     ) -> None:
-        self.name = name
+        self.name = sys.intern(name) if type(name) is str else name
         self.expression = expression
         self.fillna = fillna
         self.columns = extract_columns(expression)
+        # Derived metric names among `columns`, cached by the hypercube per derived-metrics registry version
+        self._derived_deps: Optional[Tuple[str, ...]] = None
+        self._derived_deps_version: int = -1
+
+    def __setstate__(self, state: Any) -> None:
+        _restore_slots(self, state)
 
     def get_derived_metric_details(self) -> Dict[str, Any]:
         return {
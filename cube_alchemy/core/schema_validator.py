@@ -1,10 +1,38 @@
 import logging
-from typing import Dict, Tuple, TYPE_CHECKING
+from typing import Dict, Optional, Tuple, TYPE_CHECKING
 import pandas as pd
 import copy # I need a deep copy to ensure complete isolation of the sample tables from the original data
 import re
   
 logger = logging.getLogger(__name__)
+
+# Compiled once: column names must not use the internal '<table>' suffix syntax
+_RESERVED_BRACKETS = re.compile(r'<.*>')
+_RESERVED_TABLE_PREFIXES = ('_link_table_', '_composite_')
+_RESERVED_COLUMN_PREFIXES = ('_key_', '_index_', '_composite_key_')
+
+# Validation runs on the first rows of every table only
+_SAMPLE_ROWS = 10
+
+# Signatures (table names, column names, dtypes and sample rows) that already passed validation in this process
+_VALIDATED_SCHEMAS: set = set()
+_VALIDATED_SCHEMAS_MAX = 256
+
+
+def _schema_signature(tables: Dict[str, pd.DataFrame]) -> Optional[Tuple]:
+    """Everything validation looks at: the schema plus a hash of the sample rows. None if a sample can't be hashed."""
+    try:
+        return tuple(
+            (
+                table_name,
+                tuple((str(col), str(dtype)) for col, dtype in table.dtypes.items()),
+                pd.util.hash_pandas_object(table.head(_SAMPLE_ROWS)).values.tobytes(),
+            )
+            for table_name, table in tables.items()
+        )
+    except TypeError:
+        # unhashable cell values (lists, dicts): validate every time
+        return None
   
 
 class SchemaValidator:
@@ -15,7 +43,7 @@ class SchemaValidator:
         # Create reduced tables for validation       
         reduced_tables_1 = {}
         for table_name, table in tables.items():
-            reduced_tables_1[table_name] = copy.deepcopy(table.head(10)) 
+            reduced_tables_1[table_name] = copy.deepcopy(table.head(_SAMPLE_ROWS)) 
 
         reduced_tables_2 = {}
         for table_name, table in reduced_tables_1.items():
@@ -26,18 +54,24 @@ class SchemaValidator:
     @staticmethod
     def validate(tables: Dict[str, pd.DataFrame], show_graph: bool = True) -> bool:
         from .hypercube import Hypercube
+        # The outcome only depends on the schema and the sample rows, so a signature that already passed
+        # skips the sample build
+        signature = _schema_signature(tables)
+        if signature is not None and signature in _VALIDATED_SCHEMAS:
+            return True
+
         # Create sample tables for validation
         reduced_tables_1, reduced_tables_2 = SchemaValidator._create_sample_tables(tables)
         
         # Validate reserved prefix 
         for table_name, table in reduced_tables_1.items():
-            if table_name.startswith('_link_table_') or table_name.startswith('_composite_'):
+            if table_name.startswith(_RESERVED_TABLE_PREFIXES):
                 raise ValueError(f"Table name '{table_name}' uses reserved prefix '_link_table_' or '_composite_'. This prefix is reserved for internal use.")
             for column in table.columns:
-                if column.startswith('_key_') or column.startswith('_index_') or column.startswith('_composite_key_'):
+                if column.startswith(_RESERVED_COLUMN_PREFIXES):
                     raise ValueError(f"Column '{column}' in table '{table_name}' uses reserved prefix '_key_' or '_index_' or '_composite_key_'. These prefixes are reserved for internal use.")
                 # Check that column name do not use '<*>' syntax
-                if re.search(r'<.*>', column):
+                if _RESERVED_BRACKETS.search(column):
                     raise ValueError(f"Column '{column}' in table '{table_name}' uses invalid brackets '<*>' syntax. These are reserved for internal use.")
 
         # Initialize hypercube with generated structures
@@ -61,5 +95,9 @@ class SchemaValidator:
 
             error_msg = "Cyclic relationships detected in the hypercube"
             raise ValueError(error_msg)
-        
+
+        if signature is not None:
+            if len(_VALIDATED_SCHEMAS) >= _VALIDATED_SCHEMAS_MAX:
+                _VALIDATED_SCHEMAS.clear()
+            _VALIDATED_SCHEMAS.add(signature)
         return True
\ No newline at end of file
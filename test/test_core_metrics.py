@@ -89,4 +89,267 @@ def test_readme_example_end_to_end_query_and_filter(minimal_tables, normalized_c
         result_filtered,
         index_cols=['region', 'category', 'promo_type'],
         float_cols=['Revenue', 'Margin'],
-    )
\ No newline at end of file
+    )
+
+@pytest.mark.unit
+def test_plot_data_cache_follows_filters_and_metric_changes(minimal_tables):
+    """Repeated plot preparation reuses the query result until a filter or metric changes."""
+    cube = Hypercube(copy.deepcopy(minimal_tables), validate=False, logger=False)
+    cube.define_metric(name='Units', expression='[qty]', aggregation='sum')
+    cube.define_query(name='units', dimensions=['region'], metrics=['Units'])
+
+    first, _ = cube._prepare_plot_data('units', plot_type='table')
+    calls = []
+    original_query = cube.query
+    cube.query = lambda *a, **k: calls.append(1) or original_query(*a, **k)
+    again, _ = cube._prepare_plot_data('units', plot_type='table')
+    assert calls == []
+    assert_df_equal_loose(first, again, index_cols=['region'])
+
+    cube.filter({'customer_name': ['Initech']})
+    filtered, _ = cube._prepare_plot_data('units', plot_type='table')
+    assert_df_equal_loose(cube.query('units'), filtered, index_cols=['region'])
+    assert filtered['Units'].sum() < first['Units'].sum()
+
+    cube.define_metric(name='Units', expression='[qty] * 2', aggregation='sum')
+    doubled, _ = cube._prepare_plot_data('units', plot_type='table')
+    assert doubled['Units'].sum() == 2 * filtered['Units'].sum()
+
+
+@pytest.mark.unit
+def test_spec_snapshots_are_isolated_from_caller_mutation(minimal_tables):
+    """get_queries/get_metrics results are the caller's own: edits never show up in later calls."""
+    cube = Hypercube(copy.deepcopy(minimal_tables), validate=False, logger=False)
+    cube.define_metric(name='Units', expression='[qty]', aggregation='sum')
+    cube.define_query(name='units', dimensions=['region'], metrics=['Units'])
+
+    queries = cube.get_queries()
+    queries['units']['junk'] = 1
+    queries['units']['metrics'].append('Other')
+    cube.get_metrics()['Units']['expression'] = 'changed'
+
+    assert 'junk' not in cube.get_queries()['units']
+    assert cube.get_queries()['units']['metrics'] == ['Units']
+    assert cube.queries['units']['metrics'] == ['Units']
+    assert cube.get_metrics()['Units']['expression'] == '[qty]'
+
+
+@pytest.mark.unit
+def test_prepared_plot_config_is_a_private_dict(minimal_tables):
+    """Changing the config handed to a renderer (nested values included) leaves the stored plot intact."""
+    cube = Hypercube(copy.deepcopy(minimal_tables), validate=False, logger=False)
+    cube.define_metric(name='Units', expression='[qty]', aggregation='sum')
+    cube.define_query(name='units', dimensions=['region'], metrics=['Units'])
+    cube.define_plot('units', plot_name='p', plot_type='table', custom_options={'colors': ['red']})
+
+    _, config = cube._prepare_plot_data('units', plot_name='p', plot_type='bar')
+    assert isinstance(config, dict) and config['plot_type'] == 'bar'
+    config['custom_options']['colors'].append('blue')
+    config['metrics'].append('Other')
+
+    stored = cube.get_plot_config('units', 'p')
+    assert stored['plot_type'] == 'table'
+    assert stored['custom_options'] == {'colors': ['red']}
+    assert stored['metrics'] == ['Units']
+
+
+@pytest.mark.unit
+def test_plot_data_cache_follows_reloads_and_registry_edits(minimal_tables):
+    """Cached plot data is dropped by load_data and by direct item assignment on the function registry."""
+    tables = copy.deepcopy(minimal_tables)
+    cube = Hypercube(copy.deepcopy(tables), validate=False, logger=False)
+    cube.define_metric(name='Units', expression='[qty]', aggregation='sum')
+    cube.function_registry['factor'] = 1
+    cube.define_derived_metric(name='Scaled', expression='[Units] * @factor')
+    cube.define_query(name='units', dimensions=['region'], metrics=['Units'], derived_metrics=['Scaled'])
+
+    first, _ = cube._prepare_plot_data('units', plot_type='table')
+
+    cube.function_registry['factor'] = 3
+    scaled, _ = cube._prepare_plot_data('units', plot_type='table')
+    assert scaled['Scaled'].sum() == 3 * first['Scaled'].sum()
+
+    for df in tables.values():
+        if 'qty' in df.columns:
+            df['qty'] = df['qty'] * 10
+    cube.load_data(tables, validate=False)
+    reloaded, _ = cube._prepare_plot_data('units', plot_type='table')
+    assert reloaded['Units'].sum() == 10 * first['Units'].sum()
+
+
+@pytest.mark.unit
+def test_define_query_does_not_alias_caller_lists(minimal_tables):
+    """The stored query keeps the dimensions and sort it was defined with, whatever the caller does next."""
+    cube = Hypercube(copy.deepcopy(minimal_tables), validate=False, logger=False)
+    cube.define_metric(name='Units', expression='[qty]', aggregation='sum')
+    dims = ['region']
+    sort = [('Units', 'desc')]
+    cube.define_query(name='q', dimensions=dims, metrics=['Units'], sort=sort)
+    dims.append('segment')
+    sort.append(('region', 'asc'))
+
+    assert cube.queries['q']['dimensions'] == ['region']
+    assert cube.queries['q']['sort'] == [('Units', 'desc')]
+    assert cube.get_queries()['q']['dimensions'] == ['region']
+    assert list(cube.query('q').columns) == ['region', 'Units']
+
+
+@pytest.mark.unit
+def test_str_subclass_names_are_accepted(minimal_tables):
+    """Names given as str subclasses (e.g. numpy.str_ from an array) define metrics and queries as plain strings do."""
+    np = pytest.importorskip('numpy')
+    cube = Hypercube(copy.deepcopy(minimal_tables), validate=False, logger=False)
+    for name in np.array(['Units']):
+        cube.define_metric(name=name, expression='[qty]', aggregation='sum')
+    for name in np.array(['Double']):
+        cube.define_derived_metric(name=name, expression='[Units] * 2')
+    for name in np.array(['q']):
+        cube.define_query(name=name, dimensions=['region'], metrics=list(np.array(['Units'])), derived_metrics=['Double'])
+
+    result = cube.query('q')
+    assert (result['Double'] == 2 * result['Units']).all()
+
+
+@pytest.mark.unit
+def test_plot_configs_follow_query_redefinition(minimal_tables):
+    """Plots derived from a query pick up changed dimensions/metrics and are left alone otherwise."""
+    cube = Hypercube(copy.deepcopy(minimal_tables), validate=False, logger=False)
+    cube.define_metric(name='Units', expression='[qty]', aggregation='sum')
+    cube.define_metric(name='Revenue', expression='[qty] * [price]', aggregation='sum')
+    dims = ['region']
+    cube.define_query(name='q', dimensions=dims, metrics=['Units'])
+    cube.define_plot('q', plot_name='p', plot_type='table')
+    stored = cube.plotting_components['q']['plots']['p']
+
+    # same inputs (even through the very list the query was defined with): the config object is kept
+    cube.define_query(name='q', dimensions=dims, metrics=['Units'])
+    assert cube.plotting_components['q']['plots']['p'] is stored
+
+    dims.append('segment')
+    cube.define_query(name='q', dimensions=dims, metrics=['Units'])
+    assert cube.plotting_components['q']['plots']['p'] is not stored
+    assert cube.get_plot_config('q', 'p')['dimensions'] == ['region', 'segment']
+    dims.append('customer_name')
+    assert cube.get_plot_config('q', 'p')['dimensions'] == ['region', 'segment']
+
+    cube.define_query(name='q', dimensions=dims, metrics=['Units', 'Revenue'])
+    assert cube.get_plot_config('q', 'p')['metrics'] == ['Units', 'Revenue']
+
+
+@pytest.mark.unit
+def test_query_resolves_requested_metric_defined_later(minimal_tables):
+    """A requested base metric that did not exist at define_query time is picked up once it is defined."""
+    cube = Hypercube(copy.deepcopy(minimal_tables), validate=False, logger=False)
+    cube.define_metric(name='Units', expression='[qty]', aggregation='sum')
+    cube.define_query(name='q', dimensions=['region'], metrics=['Units', 'Revenue'])
+    assert cube.queries['q']['missing_column_names'] == ('Revenue',)
+
+    cube.define_metric(name='Revenue', expression='[qty] * [price]', aggregation='sum')
+    assert cube.queries['q']['missing_column_names'] == ()
+    result = cube.query('q')
+    assert list(result.columns) == ['region', 'Units', 'Revenue']
+    assert result['Revenue'].sum() == (minimal_tables['Sales']['qty'] * minimal_tables['Sales']['price']).sum()
+
+
+@pytest.mark.unit
+def test_query_resolves_hidden_and_having_metrics_defined_later(minimal_tables):
+    """Base metrics only reached through a derived metric or HAVING are planned once they get defined."""
+    cube = Hypercube(copy.deepcopy(minimal_tables), validate=False, logger=False)
+    cube.define_metric(name='Units', expression='[qty]', aggregation='sum')
+    cube.define_derived_metric(name='AvgPrice', expression='[Revenue] / [Units]')
+    cube.define_query(name='hidden', dimensions=['region'], metrics=['Units'], derived_metrics=['AvgPrice'])
+    cube.define_query(name='having', dimensions=['region'], metrics=['Units'], having='[Revenue] > 2000')
+    assert 'Revenue' in cube.queries['hidden']['missing_column_names']
+    assert 'Revenue' in cube.queries['having']['missing_column_names']
+
+    # redefining an already resolved metric leaves the plans untouched
+    cube.define_metric(name='Units', expression='[qty]', aggregation='sum')
+    assert cube.queries['hidden']['hidden_metrics'] == ()
+
+    cube.define_metric(name='Revenue', expression='[qty] * [price]', aggregation='sum')
+    for qname in ('hidden', 'having'):
+        assert cube.queries[qname]['hidden_metrics'] == ('Revenue',)
+        assert cube.queries[qname]['missing_column_names'] == ()
+
+    hidden = cube.query('hidden')
+    assert list(hidden.columns) == ['region', 'Units', 'AvgPrice']
+    assert hidden['AvgPrice'].notna().all()
+    having = cube.query('having')
+    assert list(having.columns) == ['region', 'Units']
+    assert 0 < len(having) < len(hidden)
+
+
+@pytest.mark.unit
+def test_redefined_derived_metric_with_same_references_updates_queries(minimal_tables):
+    """A derived metric redefined over the same columns takes effect in the queries that use it."""
+    cube = Hypercube(copy.deepcopy(minimal_tables), validate=False, logger=False)
+    cube.define_metric(name='Units', expression='[qty]', aggregation='sum')
+    cube.define_metric(name='Revenue', expression='[qty] * [price]', aggregation='sum')
+    cube.define_derived_metric(name='AvgPrice', expression='[Revenue] / [Units]')
+    cube.define_derived_metric(name='AvgPriceK', expression='[AvgPrice] / 1000')
+    cube.define_query(name='q', dimensions=['region'], metrics=['Units'], derived_metrics=['AvgPriceK'])
+    before = cube.query('q')
+
+    cube.define_derived_metric(name='AvgPrice', expression='[Revenue] / [Units] * 2', fillna=0)
+    after = cube.query('q')
+    assert cube.queries['q']['derived_metrics_ordered'] == ('AvgPrice', 'AvgPriceK')
+    assert (after['AvgPriceK'] == 2 * before['AvgPriceK']).all()
+
+
+@pytest.mark.unit
+def test_cached_query_is_kept_per_query(minimal_tables, monkeypatch):
+    """A cached result survives unrelated definitions and is dropped when its own specs change."""
+    from cube_alchemy.core.hypercube_mixins import query as query_module
+
+    cube = Hypercube(copy.deepcopy(minimal_tables), validate=False, logger=False)
+    cube.define_metric(name='Units', expression='[qty]', aggregation='sum')
+    cube.define_metric(name='Other', expression='[qty]', aggregation='max')
+    cube.function_registry['factor'] = 1
+    cube.define_derived_metric(name='Scaled', expression='[Units] * @factor')
+    cube.define_query(name='q', dimensions=['region'], metrics=['Units'], derived_metrics=['Scaled'])
+    first = cube._cached_query('q')
+
+    calls = []
+    original_query = cube.query
+    cube.query = lambda *a, **k: calls.append(1) or original_query(*a, **k)
+
+    # unrelated specs and ad-hoc queries leave the entry alone
+    cube.define_query(name='other', dimensions=['segment'], metrics=['Other'])
+    cube.define_metric(name='Other', expression='[qty]', aggregation='min')
+    cube.query(options={'dimensions': ['segment'], 'metrics': ['Units']})
+    calls.clear()
+    cube._cached_query('q')
+    assert calls == []
+
+    cube.function_registry |= {'factor': 2}
+    assert cube._cached_query('q')['Scaled'].sum() == 2 * first['Scaled'].sum()
+    assert len(calls) == 1
+
+    cube.define_metric(name='Units', expression='[qty] * 10', aggregation='sum')
+    assert cube._cached_query('q')['Units'].sum() == 10 * first['Units'].sum()
+    assert len(calls) == 2
+
+    # results above the byte budget are never kept
+    monkeypatch.setattr(query_module, '_QUERY_RESULT_CACHE_BYTES', 1)
+    cube._state_changed()
+    cube._cached_query('q')
+    cube._cached_query('q')
+    assert len(calls) == 4
+    assert not cube._query_result_cache
+
+
+@pytest.mark.unit
+def test_metric_trajectory_cache_follows_relationship_changes(minimal_tables):
+    """Metric trajectories are reused for the same tables until the relationships change."""
+    cube = Hypercube(copy.deepcopy(minimal_tables), validate=False, logger=False)
+    calls = []
+    original = cube._find_complete_trajectory
+    cube._find_complete_trajectory = lambda tables: calls.append(set(tables)) or original(tables)
+
+    cube.define_metric(name='Revenue', expression='[qty] * [price]', aggregation='sum')
+    cube.define_metric(name='Units', expression='[qty]', aggregation='sum')
+    assert len(calls) == 1
+
+    cube._relationships_changed()
+    cube.define_metric(name='Units', expression='[qty]', aggregation='sum')
+    assert len(calls) == 2
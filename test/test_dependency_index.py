@@ -0,0 +1,60 @@
+import random
+
+import pytest
+
+from cube_alchemy.core.dependency_index import DependencyIndex
+
+
+def _edges(index: DependencyIndex) -> set:
+    return {(source, dep) for source, deps in index.snapshot().items() for dep in deps}
+
+
+@pytest.mark.unit
+def test_set_sources_replaces_only_the_dependent_edges():
+    index = DependencyIndex()
+    index.add_many(['Revenue', 'Units'], 'query', 'q1')
+    index.add('Revenue', 'query', 'q2')
+    index.add('q1', 'plot', 'p1')
+
+    index.set_sources(['Units', 'Cost', ''], 'query', 'q1')
+    assert index.get('Revenue') == {('query', 'q2')}
+    assert index.get('Units') == {('query', 'q1')}
+    assert index.get('Cost') == {('query', 'q1')}
+    assert index.get('q1') == {('plot', 'p1')}
+
+    index.remove_query('q1')
+    assert _edges(index) == {('Revenue', ('query', 'q2')), ('q1', ('plot', 'p1'))}
+    # a removed dependent starts from scratch when it is registered again
+    index.set_sources(['Revenue'], 'query', 'q1')
+    assert index.get('Revenue') == {('query', 'q1'), ('query', 'q2')}
+    assert index.get('Units') == set()
+
+
+@pytest.mark.unit
+def test_set_sources_matches_remove_then_add():
+    # random edits against a reference that rebuilds every dependent's edges from scratch
+    rng = random.Random(7)
+    sources = [f's{i}' for i in range(8)]
+    dependents = [('query', f'q{i}') for i in range(4)] + [('plot', f'p{i}') for i in range(2)]
+    index = DependencyIndex()
+    expected: dict = {}
+    for _ in range(300):
+        kind, name = rng.choice(dependents)
+        action = rng.random()
+        if action < 0.6:
+            chosen = set(rng.sample(sources, rng.randint(0, 4)))
+            index.set_sources(chosen, kind, name)
+            expected[(kind, name)] = chosen
+        elif action < 0.75:
+            source = rng.choice(sources)
+            index.add(source, kind, name)
+            expected.setdefault((kind, name), set()).add(source)
+        elif action < 0.9:
+            (index.remove_query if kind == 'query' else index.remove_plot)(name)
+            expected.pop((kind, name), None)
+        else:
+            source = rng.choice(sources)
+            index.pop(source)
+            for known in expected.values():
+                known.discard(source)
+        assert _edges(index) == {(s, dep) for dep, known in expected.items() for s in known}
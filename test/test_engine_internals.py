@@ -0,0 +1,130 @@
+import random
+from collections import deque
+
+import pandas as pd
+import pytest
+
+from cube_alchemy.core.hypercube_mixins.engine import Engine
+
+
+def _plain_bfs_path(relationships, start_table, end_table):
+    # reference: single-ended BFS over the relationships in insertion order
+    queue = deque([(start_table, [])])
+    visited = {start_table}
+    while queue:
+        current_table, path = queue.popleft()
+        if current_table == end_table:
+            return path
+        for (table1, table2), (key1, key2) in relationships.items():
+            if table1 == current_table and table2 not in visited:
+                visited.add(table2)
+                queue.append((table2, path + [(table1, table2, key1, key2)]))
+    return None
+
+
+def _engine_with_relationships(pairs):
+    engine = Engine.__new__(Engine)
+    engine.relationships = {}
+    for a, b in pairs:
+        engine.relationships[(a, b)] = (f'key_{a}', f'key_{b}')
+        engine.relationships[(b, a)] = (f'key_{b}', f'key_{a}')
+    engine._relationships_changed()
+    return engine
+
+
+def _is_chain(path, start_table, end_table, relationships):
+    tables = [start_table] + [step[1] for step in path]
+    return (
+        tables[-1] == end_table
+        and all(step[0] == table for step, table in zip(path, tables))
+        and all(relationships[(t1, t2)] == (k1, k2) for t1, t2, k1, k2 in path)
+    )
+
+
+@pytest.mark.unit
+def test_bidirectional_path_search_matches_plain_bfs_on_forests():
+    # model graphs are acyclic, where the path between two tables is unique: both searches must agree exactly
+    rng = random.Random(1)
+    for _ in range(200):
+        size = rng.randint(1, 12)
+        pairs = [(f't{i}', f't{rng.randrange(i)}') for i in range(1, size) if rng.random() < 0.9]
+        engine = _engine_with_relationships(pairs)
+        for x in range(size):
+            for y in range(size):
+                start, end = f't{x}', f't{y}'
+                assert engine._find_path_uncached(start, end) == _plain_bfs_path(engine.relationships, start, end)
+
+
+@pytest.mark.unit
+def test_bidirectional_path_search_finds_shortest_paths_with_cycles():
+    # with cycles several shortest paths can tie; the result must still be a valid shortest chain
+    rng = random.Random(2)
+    for _ in range(100):
+        size = rng.randint(2, 10)
+        pairs = {tuple(rng.sample([f't{i}' for i in range(size)], 2)) for _ in range(rng.randint(1, 2 * size))}
+        engine = _engine_with_relationships(sorted(pairs))
+        for x in range(size):
+            for y in range(size):
+                start, end = f't{x}', f't{y}'
+                expected = _plain_bfs_path(engine.relationships, start, end)
+                path = engine._find_path_uncached(start, end)
+                if expected is None:
+                    assert path is None
+                else:
+                    assert len(path) == len(expected)
+                    assert _is_chain(path, start, end, engine.relationships)
+
+
+def _merge_reference(cube, columns_to_fetch, keys_and_indexes_df):
+    # reference: one left merge per source table, as the fetch did before the positional gather
+    by_table = {}
+    for col in columns_to_fetch:
+        table_name = cube.column_to_table[col]
+        if not col.startswith(('_index_', '_key_')):
+            by_table.setdefault(table_name, []).append(col)
+    out = keys_and_indexes_df
+    for table_name, cols in by_table.items():
+        join_column = cube._table_join_column_map[table_name]
+        out = pd.merge(out, cube.tables[table_name][[join_column] + cols], on=join_column, how='left')
+    return out
+
+
+@pytest.fixture()
+def gather_cube():
+    from cube_alchemy import Hypercube
+
+    sales = pd.DataFrame({'sale_id': [10, 11, 12, 13], 'product_id': [1, 2, 1, 3], 'qty': [1, 2, 3, 4]})
+    products = pd.DataFrame({'product_id': [1, 2, 3], 'category': ['a', 'b', None], 'cost': [1.5, 2.5, 3.5]})
+    return Hypercube({'Sales': sales, 'Product': products}, validate=False, logger=False)
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize('case', ['all', 'reversed_index', 'missing', 'na', 'clash'])
+def test_positional_gather_matches_merge(gather_cube, case):
+    cube = gather_cube
+    keys = cube.context_states['Unfiltered'].copy()
+    columns = ['category', 'cost', 'qty', 'sale_id', 'product_id']
+    if case == 'reversed_index':
+        keys = keys.iloc[::-1]
+    elif case == 'missing':
+        keys.loc[0, '_index_Product'] = 7  # no such row
+    elif case == 'na':
+        keys.loc[1, '_index_Product'] = pd.NA
+        keys.loc[2, '_key_product_id'] = pd.NA
+    elif case == 'clash':
+        keys['category'] = 'already there'
+
+    result = cube._fetch_and_merge_columns(columns, keys)
+    expected = _merge_reference(cube, columns, keys)
+    pd.testing.assert_frame_equal(result, expected)
+
+
+@pytest.mark.unit
+def test_positional_gather_matches_merge_on_reordered_tables(gather_cube):
+    # a table whose index column no longer lists the row positions goes through the index lookup
+    cube = gather_cube
+    cube.tables['Product'] = cube.tables['Product'].iloc[[2, 0, 1]].reset_index(drop=True)
+    keys = cube.context_states['Unfiltered']
+    for columns in (['category', 'cost'], ['cost', 'product_id'], ['category']):
+        result = cube._fetch_and_merge_columns(columns, keys)
+        pd.testing.assert_frame_equal(result, _merge_reference(cube, columns, keys))
@@ -1,4 +1,5 @@
 import pandas as pd
+import pytest
 import copy
 
 from cube_alchemy.core.hypercube import Hypercube
@@ -56,6 +57,32 @@ def test_multi_table_initialization_keyspace():
     assert unfiltered[idx_customers].nunique() <= len(customers)
 
 
+def test_link_table_keys_are_unique_per_shared_value():
+    # customer 40 only exists in the second table, after values both tables share
+    orders = pd.DataFrame({
+        'order_id': [1, 2, 3, 4],
+        'customer_id': [10, 10, 20, 30],
+    })
+    customers = pd.DataFrame({
+        'customer_id': [10, 20, 40],
+        'segment': ['A', 'B', 'C'],
+    })
+
+    cube = Hypercube(copy.deepcopy({'Orders': orders, 'Customers': customers}))
+
+    link = cube.tables['_link_table_customer_id']
+    assert sorted(link['customer_id']) == [10, 20, 30, 40]
+    assert link['_key_customer_id'].notna().all()
+    assert link['_key_customer_id'].is_unique
+
+    # each table row carries the key of its own value
+    key_of = dict(zip(link['customer_id'], link['_key_customer_id']))
+    for table_name in ('Orders', 'Customers'):
+        table = cube.tables[table_name]
+        values = table[f'customer_id <{table_name}>']
+        assert list(table['_key_customer_id']) == [key_of[v] for v in values]
+
+
 def test_single_table_basic_metric_and_query(minimal_tables):
     minimal_tables = copy.deepcopy(minimal_tables)
     # Use Sales only from the minimal dataset
@@ -107,4 +134,103 @@ def test_multi_table_basic_metric_by_dimension(minimal_tables):
     for seg, val in exp_map.items():
         assert seg in res_map
         assert abs(res_map[seg] - val) < 1e-9
-    
\ No newline at end of file
+    
+
+def test_schema_validation_cache_tracks_sample_data(minimal_tables, monkeypatch):
+    # Same tables skip the sample build; the same schema with other data is validated again
+    from cube_alchemy.core import schema_validator
+    from cube_alchemy.core.schema_validator import SchemaValidator
+
+    monkeypatch.setattr(schema_validator, '_VALIDATED_SCHEMAS', set())
+    builds = []
+    original = SchemaValidator._create_sample_tables
+    monkeypatch.setattr(
+        SchemaValidator, '_create_sample_tables',
+        staticmethod(lambda tables: builds.append(1) or original(tables)),
+    )
+
+    tables = copy.deepcopy(minimal_tables)
+    assert SchemaValidator.validate(tables, show_graph=False)
+    assert SchemaValidator.validate(copy.deepcopy(tables), show_graph=False)
+    assert len(builds) == 1
+
+    other = copy.deepcopy(tables)
+    other['Sales']['qty'] = other['Sales']['qty'] + 1
+    assert SchemaValidator.validate(other, show_graph=False)
+    assert len(builds) == 2
+
+
+def _orders_and_customers(rows):
+    orders = pd.DataFrame({
+        'order_id': range(rows),
+        'customer_id': [i % 3 for i in range(rows)],
+        'amount': 1.0,
+    })
+    customers = pd.DataFrame({
+        'customer_id': [0, 1, 2],
+        'segment': ['A', 'B', 'C'],
+    })
+    return {'Orders': orders, 'Customers': customers}
+
+
+@pytest.mark.parametrize('rows, index_dtype', [(2**15 - 1, 'Int16'), (2**15, 'Int32')])
+def test_index_width_follows_row_count(rows, index_dtype):
+    # _index_ columns take the narrowest width holding 0..rows-1; small tables stay 16-bit next to wide ones
+    cube = Hypercube(_orders_and_customers(rows))
+
+    index = cube.tables['Orders']['_index_Orders']
+    assert str(index.dtype) == index_dtype
+    assert index.iloc[-1] == rows - 1
+    assert str(cube.tables['Customers']['_index_Customers'].dtype) == 'Int16'
+
+    # the row on the boundary is reachable through the core and keeps its segment
+    cube.define_metric(name='Amount', expression='[amount]', aggregation='sum')
+    cube.define_query(name='by segment', dimensions=['segment'], metrics=['Amount'])
+    result = cube.query('by segment')
+    assert dict(zip(result['segment'], result['Amount'])) == {
+        seg: float(len(range(i, rows, 3))) for i, seg in enumerate('ABC')
+    }
+    cube.filter({'order_id': [rows - 1]})
+    assert list(cube.query('by segment')['segment']) == ['ABC'[(rows - 1) % 3]]
+
+
+def test_index_width_is_recomputed_on_reload():
+    # load_data sizes the surrogate keys for the new tables, in both directions
+    cube = Hypercube(_orders_and_customers(2**15))
+    cube.define_metric(name='Amount', expression='[amount]', aggregation='sum')
+    cube.define_query(name='by segment', dimensions=['segment'], metrics=['Amount'])
+
+    for rows, index_dtype in ((7, 'Int16'), (2**15 + 5, 'Int32')):
+        cube.load_data(_orders_and_customers(rows))
+        assert str(cube.tables['Orders']['_index_Orders'].dtype) == index_dtype
+        assert cube.query('by segment')['Amount'].sum() == rows
+
+
+@pytest.mark.parametrize('products, key_dtype', [(2**15 - 1, 'Int16'), (2**15, 'Int32')])
+def test_link_key_width_follows_distinct_values(products, key_dtype):
+    # link keys 1..n take the narrowest width holding n; joins mix them with 16-bit keys and indexes
+    tables = _orders_and_customers(products)
+    tables['Orders']['product_id'] = range(products)
+    tables['Products'] = pd.DataFrame({
+        'product_id': range(products),
+        'category': ['odd' if i % 2 else 'even' for i in range(products)],
+    })
+    cube = Hypercube(tables)
+
+    link = cube.tables['_link_table_product_id']
+    assert str(link['_key_product_id'].dtype) == key_dtype
+    assert link['_key_product_id'].iloc[-1] == products
+    assert str(cube.tables['Orders']['_key_product_id'].dtype) == key_dtype
+    assert str(cube.tables['Orders']['_key_customer_id'].dtype) == 'Int16'
+
+    cube.define_metric(name='Amount', expression='[amount]', aggregation='sum')
+    cube.define_query(name='by category and segment', dimensions=['category', 'segment'], metrics=['Amount'])
+    result = cube.query('by category and segment')
+    assert result['Amount'].sum() == products
+    assert result.notna().all().all()
+
+    # the product holding the largest key joins through both link tables to the right rows
+    last = products - 1
+    cube.filter({'product_id': [last]})
+    result = cube.query('by category and segment')
+    assert result[['category', 'segment']].values.tolist() == [['odd' if last % 2 else 'even', 'ABC'[last % 3]]]
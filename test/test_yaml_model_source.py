@@ -134,3 +134,42 @@ def test_load_lifts_nested_sections_to_top_level_with_query(tmp_path: Path) -> N
     assert data["plots"]["q1:p1"]["name"] == "p1"  # name is still just p1, not the composite key
     assert data["transformers"]["t1"]["kind"] == "transformers"
     assert data["transformers"]["t1"]["name"] == "t1"
+
+
+@pytest.mark.unit
+def test_load_cache_is_isolated_and_invalidated_on_edit(tmp_path: Path) -> None:
+    ypath = tmp_path / "model.yaml"
+    write_yaml(ypath, {"queries": {"q1": {"dimensions": ["a"], "plots": {"p1": {"type": "bar"}}}}})
+
+    first = ModelYAMLSource(ypath)._load()
+    # A second source over the same unchanged file must still see the nested plot (cache not mutated by lifting)
+    second = ModelYAMLSource(ypath)._load()
+    assert "q1:p1" in second.get("plots", {})
+    assert first["plots"]["q1:p1"] is not second["plots"]["q1:p1"]
+
+    # Editing the file invalidates the cached parse
+    write_yaml(ypath, {"queries": {"q2": {"dimensions": ["b", "c"]}}})
+    third = ModelYAMLSource(ypath)._load()
+    assert "q2" in third["queries"] and "q1" not in third["queries"]
+
+
+@pytest.mark.unit
+def test_catalog_reload_after_load_data_replans_metrics(tmp_path: Path, monkeypatch) -> None:
+    """Unchanged catalog specs must still be re-applied when the data (and so the schema) was reloaded."""
+    import pandas as pd
+    from cube_alchemy import Hypercube
+
+    monkeypatch.chdir(tmp_path)
+    sales = pd.DataFrame({'product': ['a', 'b'], 'qty': [1, 2]})
+    product = pd.DataFrame({'product': ['a', 'b'], 'price': [1.0, 2.0]})
+    cube = Hypercube({'Sales': sales, 'Product': product}, validate=False, logger=False)
+    cube.set_yaml_model_catalog('model.yaml')
+    cube.define_metric(name='Revenue', expression='[qty] * [price]', aggregation='sum')
+    cube.save_to_model_catalog()
+    cube.load_from_model_catalog()
+    assert cube.metrics['Revenue'].columns_indexes == ['_index_Sales', '_index_Product']
+
+    # price now lives on Sales and the Product table is gone
+    cube.load_data({'Sales': sales.assign(price=[1.0, 2.0])}, validate=False)
+    cube.load_from_model_catalog()
+    assert cube.metrics['Revenue'].columns_indexes == ['_index_Sales']